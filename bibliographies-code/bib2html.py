@@ -3,7 +3,7 @@
 
 """
 The script processes the BIB database and generates html pages for https://github.com/webis-de/webis-de.github.io
-using a jinja2 template and lxml.html.builder.
+using jinja2 templates.
 
 usage: bib2html.py [-h] --input-path INPUT_PATH --output-path OUTPUT_PATH
 
@@ -13,40 +13,66 @@ arguments:
                         Input path to CVS folder containing Webis web-database *.bib files (data-webis.bib, etc.)
   --output-path OUTPUT_PATH
                         Output path where generated HTML files should be exported (e.g. webis-de.github.io repository)
+  --jobs N, -j N        Number of worker processes used to parse and render the bib files (1 by default)
+  --shards N            Split the ir-anthology bib file into N chunks that are parsed and prepared in parallel
+  --cache-path CACHE_PATH
+                        Folder where parsed and prepared bib entries are cached between runs (disabled by default)
+  --incremental         Only prepare and render publications whose bib source changed (requires --cache-path)
+  --split-years         Write the ir-anthology as one html file per year plus a manifest.json
+  --page-size N         With --split-years, split years into pages of at most N entries
+  --search-index        Also write an inverted index of every publications list as static JSON files to search-index/
+  --bibtex-files        Write the BibTeX of the publications to one JSON file per year in bibtex/, loaded on demand,
+                        instead of into a textarea of every entry
+  --facets              Also write the author, venue and year facets of every publications list to facets/<name>.json
+  --watch               Keep running and rebuild the outputs whose bib files or templates changed
+  --artifacts-path ARTIFACTS_PATH
+                        Folder with local clones <username>/<repo> of the artifact repositories (e.g. webis-de/downloads)
+  --artifacts-ttl SECONDS
+                        Seconds a listing of an artifact repository cached in --cache-path is used without revalidation
+  --timings-path TIMINGS_PATH
+                        JSON file to write the timings of all task phases, entry counts, peak RSS and cache hit rates to
+  --profile PROFILE_PATH
+                        Run under cProfile, write the stats to PROFILE_PATH and log the slowest functions
 
 """
 
 import argparse
 import base64
+import hashlib
 import re
 import time
-from html import escape
 import logging
 import io
+import itertools
 import json
 import os
 import pathlib
+import pickle
 import sys
-import random
+import tempfile
 import traceback
 from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
+# requests, cProfile and the process pool are imported where they are used, since most runs do not need them
 import jinja2
-import lxml.html
 import pybtex.errors
-import requests
-from jinja2 import Template, Environment, BaseLoader, FileSystemLoader, StrictUndefined
-from lxml import etree as et
-from lxml.html.builder import *
+import pybtex.io
 
 from pybtex import textutils
 from pybtex.database.input.bibtex import month_names
 from pybtex.bibtex.utils import split_name_list, split_tex_string
 from pybtex.database import Person, Entry
-from pybtex.richtext import Text, BaseText
+from pybtex.richtext import Text
 from pybtex.database.input.bibtex import DuplicateField
-from pybtex.py3compat import fix_unicode_literals_in_doctest
+from pybtex.exceptions import PybtexError
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 # sys.path.insert(0, script_dir + '/pybtex.zip')
@@ -87,18 +113,98 @@ github_webis = {
     }
 }
 
+github_api_url = "https://api.github.com"
+# retries of failed GitHub requests, waiting github_backoff * 2 ** (retry - 1) seconds before each
+github_retries = 4
+github_backoff = 0.5
+
 max_editor_names = 4
 
+# bump whenever the parsing or preparation of entries changes, to invalidate existing caches
+cache_version = 4
+
+# month numbers by lowercase month name, as datetime.strptime(month, "%B") parses them
+month_numbers = {name.lower(): number for number, name in enumerate(month_names.values(), start=1)}
+# booktitles starting with a digit are sorted before the others
+booktitle_digit_regex = re.compile(r"^([0-9])")
+# fields of the search index, like the data- attributes of the bib-entry divs: index field -> entry field
+search_index_fields = {'author': 'data_author', 'editor': 'data_editor', 'title': 'title', 'booktitle': 'booktitle',
+                       'journal': 'journal', 'series': 'series', 'publisher': 'publisher', 'school': 'school',
+                       'keywords': 'keywords', 'year': 'year'}
+search_index_prefix_length = 2
+search_term_regex = re.compile(r"\w+")
+# entry type and key of an @entry, like pybtex.database.input.bibtex.LowLevelParser reads them
+bib_key_regex = re.compile(r"@\s*([^\s{(@]+)\s*(?:\{\s*([^\s,}]+)|\(\s*([^\s,]+))")
+bib_delimiter_regex = re.compile(r"[@{}()]")
+
+
+class DuplicateKeys:
+    """Makes repeated entry keys unique: the n-th entry with a key gets the key <key>-<n>, unless that key is taken
+    as well. The renamed keys are collected as report, in the order of the entries.
+    """
+
+    def __init__(self):
+        self.seen_keys = set()
+        # last suffix used per lowercase key
+        self.suffixes = {}
+        self.keys = []
+        self.duplicates = []
+
+    def copy(self):
+        """
+        :return: DuplicateKeys that continues with the keys seen so far, with an empty report
+        """
+        duplicate_keys = DuplicateKeys()
+        duplicate_keys.seen_keys = set(self.seen_keys)
+        duplicate_keys.suffixes = dict(self.suffixes)
+        return duplicate_keys
+
+    def resolve(self, key):
+        """
+        :return: key, or a new unique key if key was seen before
+        """
+        self.keys.append(key)
+        if key.lower() in self.seen_keys:
+            suffix = self.suffixes.get(key.lower(), 1)
+            while True:
+                suffix += 1
+                unique_key = f"{key}-{suffix}"
+                if unique_key.lower() not in self.seen_keys:
+                    break
+            self.suffixes[key.lower()] = suffix
+            self.duplicates.append((key, unique_key))
+            key = unique_key
+        self.seen_keys.add(key.lower())
+        return key
+
+
+def report_duplicate_keys(duplicates):
+    """Count the renamed keys in the build stats.
+
+    :param duplicates: DuplicateKeys.duplicates
+    :return: note for the list of parsed bib files, empty if there are no duplicates
+    """
+    if not duplicates:
+        return ""
+    build_stats.count("duplicate_keys", len(duplicates))
+    return f" ({len(duplicates)} duplicate keys renamed: " + \
+           ", ".join(f"{key} -> {unique_key}" for key, unique_key in duplicates) + ")"
+
 
 class WebisBibParser(bibtex.Parser):
-    def __init__(self, *args, bib_type="other", **kwargs):
+    def __init__(self, *args, bib_type="other", duplicate_keys=None, **kwargs):
         """
         :param bib_type: "data" or "other"
+        :param duplicate_keys: DuplicateKeys to continue with, e.g. with the keys of the previous chunks of a file
         """
         super(WebisBibParser, self).__init__(*args, **kwargs)
         self.bib_type = bib_type
+        self.duplicate_keys = duplicate_keys or DuplicateKeys()
 
-    def process_entry(self, entry_type, key, fields):
+    def make_entry(self, entry_type, key, fields):
+        """
+        :return: tuple (key, entry), duplicate keys are made unique
+        """
         entry = Entry(entry_type)
 
         if key is None:
@@ -119,20 +225,61 @@ class WebisBibParser(bibtex.Parser):
             else:
                 entry.fields[field_name] = field_value
             seen_fields.add(field_name.lower())
-        if key in self.data.entries:
-            #TODO: Find another solution this is just a hack to deal with duplicates
-            key = key + "-" + str(random.randrange(0,1000,2))
-        self.data.add_entry(key, entry)
+        key = self.duplicate_keys.resolve(key)
+        entry.key = key
+        return key, entry
+
+    def process_entry(self, entry_type, key, fields):
+        self.data.add_entry(*self.make_entry(entry_type, key, fields))
+
+    def iter_entries(self, text):
+        """Streaming alternative to parse_string: yields the (key, entry) tuples one after another instead of
+        collecting them in self.data, so that they can be prepared while the rest of the text is parsed.
+        """
+        self.unnamed_entry_counter = 1
+        self.command_start = 0
+
+        entry_iterator = bibtex.LowLevelParser(
+            text,
+            keyless_entries=self.keyless_entries,
+            handle_error=self.handle_error,
+            want_entry=self.data.want_entry,
+            filename=self.filename,
+            macros=self.macros,
+        )
+        for entry in entry_iterator:
+            entry_type = entry[0]
+            if entry_type.lower() not in ['string', 'preamble']:
+                yield self.make_entry(entry_type, *entry[1])
+
+    def iter_file(self, filename):
+        """Streaming alternative to parse_file, see iter_entries."""
+        self.filename = filename
+        with pybtex.io.open_unicode(filename, encoding=self.encoding) as f:
+            try:
+                text = f.read()
+            except UnicodeDecodeError as e:
+                raise PybtexError(str(e), filename=self.filename)
+        yield from self.iter_entries(text)
 
 
 def split_name_list_comma(string):
     return split_tex_string(string, " *[,]{1} *")
 
 
+# rendered names by (first names, middle names, last names, format), so that every person is rendered once per run
+person_name_cache = {}
+
+
 def get_person_name(person, format="latex"):
-    return f"{' '.join(n.render_as(format) for n in person.rich_first_names)} " \
-           f"{' '.join(n.render_as(format) for n in person.rich_middle_names)} " \
-           f"{' '.join(n.render_as(format) for n in person.rich_last_names)}"
+    key = (tuple(person.first_names), tuple(person.middle_names), tuple(person.last_names), format)
+    person_name = person_name_cache.get(key)
+    if person_name is None:
+        person_name = f"{' '.join(n.render_as(format) for n in person.rich_first_names)} " \
+                      f"{' '.join(n.render_as(format) for n in person.rich_middle_names)} " \
+                      f"{' '.join(n.render_as(format) for n in person.rich_last_names)}"
+        person_name_cache[key] = person_name
+    return person_name
 
 def format_persons(persons, format="latex", max_persons=9999):
     persons_str = ""
@@ -193,47 +340,1075 @@ def get_raw_bib_entry(item):
     return f"""@{item.original_type}{{{item.key},\n{fields_string[:-2]}\n}}"""
 
 
-def request_github(username, repo):
+github_session = None
+
+
+def get_github_session():
+    """
+    :return: requests session shared by all GitHub requests, which reuses connections and retries failed requests
+    """
+    global github_session
+    if github_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(total=github_retries, backoff_factor=github_backoff, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET"], respect_retry_after_header=True)
+        github_session = requests.Session()
+        github_session.mount("https://", HTTPAdapter(max_retries=retry, pool_maxsize=len(github_webis)))
+        github_session.mount("http://", HTTPAdapter(max_retries=retry, pool_maxsize=len(github_webis)))
+    return github_session
+
+
+def request_github(username, repo, etag=None):
+    """Request the recursive file tree of a GitHub repository.
+
+    :param etag: ETag of a previous response, to only receive the tree if it changed since then
+    :return: the tree response and its ETag, the response is None if the tree did not change
+    """
     # authorization = f'token {access_token}'
     headers = {
         "Accept": "application/vnd.github.v3+json",
         # "Authorization": authorization,
     }
+    if etag:
+        headers["If-None-Match"] = etag
 
-    url_api_repos = "https://api.github.com/repos"
+    url_api_repos = f"{github_api_url}/repos"
     url_api_param_tree = "git/trees/HEAD?recursive=1"
     url_repo_base = f"{url_api_repos}/{username}/{repo}"
     url_repo_tree = f"{url_repo_base}/{url_api_param_tree}"
 
-    response = requests.get(url_repo_tree, headers=headers)
+    response = get_github_session().get(url_repo_tree, headers=headers, timeout=60)
+    if response.status_code == 304:
+        return None, etag
     response.raise_for_status()
-    return json.loads(response.content.decode('utf-8'))
+    return json.loads(response.content.decode('utf-8')), response.headers.get("ETag")
 
 
 def get_downloads_url(path):
     return f"downloads/{path}"
 
-def get_existing_hrefs(username, repo, directory):
+
+def get_local_artifact_paths(repo_path):
+    """
+    :param repo_path: local clone or copy of an artifact repository
+    :return: paths of all files in the repository relative to repo_path, like the paths of the GitHub tree
+    """
+    paths = []
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        paths += [pathlib.Path(root, f).relative_to(repo_path).as_posix() for f in files]
+    return paths
+
+
+# folders of the artifact repositories and the resource types of their files
+artifact_folders = {'papers': "publications", 'posters': "posters", 'slides': "slides"}
+artifact_key_regex = re.compile(r'\/([a-z_\-0-9]*)\..*$')
+# artifact names of the entry fields that are not named <artifact>url
+artifact_names = {'doi': "doi", 'posters_href': "poster", 'slides_href': "slides"}
+
+
+def get_existing_hrefs(paths, directory):
+    """Index the artifacts of a website in one pass over the repository listing.
+
+    :param paths: file paths of an artifact repository, see ArtifactIndex.get_paths
+    :param directory: folder of the website in the repository, see github_webis
+    :return: dict bibid -> dict resource type (publications, posters, slides) -> href
+    """
     existing_hrefs = dict()
-    key_regex = re.compile(r'\/([a-z_\-0-9]*)\..*$')
-    for i in range(2):  # retry in case of a connection issue
+    prefix = directory + "/"
+    for path in paths:
+        if not path.startswith(prefix):
+            continue
+        resource_type = artifact_folders.get(path[len(prefix):].split("/", 1)[0])
+        if resource_type is None:
+            continue
+        key_match = artifact_key_regex.search(path)
+        if key_match:
+            existing_hrefs.setdefault(key_match.group(1), {})[resource_type] = get_downloads_url(path)
+    return existing_hrefs
+
+
+def get_artifact_name(field_name):
+    """
+    :return: name of the artifact an entry field links to (doi, poster, slides, code, data, ...) or None
+    """
+    artifact_name = artifact_names.get(field_name)
+    if artifact_name is None and field_name.endswith("url") and field_name != "url":
+        artifact_name = field_name[:-len("url")]
+        if artifact_name.endswith("_href"):
+            artifact_name = artifact_name[:-len("_href")]
+        artifact_name = artifact_name.replace("posters", "poster")
+    return artifact_name
+
+
+class ArtifactIndex:
+    """File listings of the artifact repositories in github_webis, loaded once and shared by all outputs of a run.
+
+    A listing is read from a local clone in artifacts_path/<username>/<repo> if there is one. Otherwise it is
+    requested from GitHub and, with a cache_path, stored on disk: a stored listing is used without any request for
+    ttl seconds, after that it is revalidated with its ETag, and it is still used if GitHub can not be reached.
+    GitHub is then not requested for this repository again until the next run, see start_run.
+    Listings can be prefetched in background threads, to load them while the bib files are parsed.
+    """
+
+    def __init__(self, artifacts_path=None, cache_path=None, ttl=3600):
+        self.artifacts_path = pathlib.Path(artifacts_path) if artifacts_path else None
+        self.cache = EntryCache(cache_path) if cache_path else None
+        self.ttl = ttl
+        self.listings = {}
+        self.pending = {}
+        self.hrefs = {}
+        # repositories whose request failed in this run, their stored listing is used until the next run
+        self.unreachable = set()
+
+    def start_run(self):
+        """Request the repositories that could not be reached in the previous run again, if their listings are loaded.
+        """
+        self.unreachable.clear()
+
+    def is_fresh(self, username, repo):
+        listing = self.listings.get((username, repo))
+        return listing is not None and ((username, repo) in self.unreachable
+                                        or time.time() - listing['fetched'] <= self.ttl)
+
+    def prefetch(self, repos):
+        """Start loading the listings of all given (username, repo) pairs at the same time, without waiting for them.
+        """
+        repos = {repo for repo in repos if repo not in self.pending and not self.is_fresh(*repo)}
+        if not repos:
+            return
+        executor = ThreadPoolExecutor(max_workers=len(repos))
+        for username, repo in repos:
+            self.pending[(username, repo)] = executor.submit(self.load_listing, username, repo,
+                                                             self.listings.get((username, repo)))
+        executor.shutdown(wait=False)
+
+    def get_paths(self, username, repo):
+        """
+        :return: paths of all files in the repository
+        """
+        if (username, repo) in self.pending:
+            listing = self.pending.pop((username, repo)).result()
+            self.listings[(username, repo)] = listing
+            return listing['paths']
+        if not self.is_fresh(username, repo):
+            self.listings[(username, repo)] = self.load_listing(username, repo, self.listings.get((username, repo)))
+        return self.listings[(username, repo)]['paths']
+
+    def load_listing(self, username, repo, listing=None):
+        if self.artifacts_path and (self.artifacts_path / username / repo).is_dir():
+            return {'paths': get_local_artifact_paths(self.artifacts_path / username / repo), 'etag': None,
+                    'fetched': time.time()}
+
+        cache_name = f"artifacts.{username}.{repo}"
+        cache_key = EntryCache.get_key(None, "artifacts", username, repo)
+        if listing is None and self.cache:
+            listing = self.cache.load(cache_name, cache_key)
+            if listing is not None and time.time() - listing['fetched'] <= self.ttl:
+                return listing
+
         try:
-            response = request_github(username=username, repo=repo)
-            existing_hrefs['publications'] = {key_regex.findall(x['path'])[0]: get_downloads_url(x['path']) for x in
-                                              response['tree'] if x['path'].startswith(directory + '/papers/')}
-            existing_hrefs['posters'] = {key_regex.findall(x['path'])[0]: get_downloads_url(x['path']) for x in
-                                         response['tree'] if x['path'].startswith(directory + '/posters/')}
-            existing_hrefs['slides'] = {key_regex.findall(x['path'])[0]: get_downloads_url(x['path']) for x in
-                                        response['tree'] if x['path'].startswith(directory + '/slides/')}
-        except Exception as e:
-            print(e)
-            bib2html_logger.error("Error occurred while requesting Webis resources data from GitHub.",
-                                  exc_info=True)
-            traceback.print_exc()
-            sys.exit(1)
-        break
+            response, etag = request_github(username, repo, listing['etag'] if listing else None)
+        except Exception:
+            if listing is None:
+                bib2html_logger.error("Error occurred while requesting Webis resources data from GitHub.",
+                                      exc_info=True)
+                traceback.print_exc()
+                sys.exit(1)
+            bib2html_logger.warning(f"Could not request {username}/{repo} from GitHub, using the listing of "
+                                    f"{datetime.fromtimestamp(listing['fetched']).isoformat(timespec='seconds')}.")
+            self.unreachable.add((username, repo))
+            return listing
+
+        paths = [x['path'] for x in response['tree']] if response is not None else listing['paths']
+        listing = {'paths': paths, 'etag': etag, 'fetched': time.time()}
+        if self.cache:
+            self.cache.dump(cache_name, cache_key, listing)
+        return listing
+
+    def get_existing_hrefs(self, username, repo, directory):
+        """
+        :return: see get_existing_hrefs, computed once per directory of a repository listing
+        """
+        paths = self.get_paths(username, repo)
+        hrefs = self.hrefs.get((username, repo, directory))
+        if hrefs is None or hrefs[0] is not paths:
+            hrefs = (paths, get_existing_hrefs(paths, directory))
+            self.hrefs[(username, repo, directory)] = hrefs
+        return hrefs[1]
+
+
+def add_artifacts(existing_hrefs, domain, item):
+    """Set the <resource type>_href fields of the artifacts of item and list all its artifacts in the artifacts field.
+    """
+    hrefs = existing_hrefs.get(item.fields['bibid'])
+    if hrefs:
+        for resource_type in artifact_folders.values():
+            if resource_type in hrefs:
+                item.fields[resource_type + '_href'] = domain + "/" + hrefs[resource_type]
+
+    artifacts = []
+    for field_name, value in item.fields.items():
+        artifact_name = get_artifact_name(field_name)
+        if artifact_name is not None and value != "":
+            artifacts.append(artifact_name)
+    if len(artifacts) > 0:
+        item.fields['artifacts'] = ",".join(artifacts)
+    return item
+
+
+class BuildStats:
+    """Timings of the phases of the tasks (parse, persons, raw_bib, latex_to_text, artifacts, sort, render, write,
+    ...) and counters like the number of entries, collected in the process the phases run in.
+
+    Worker processes send their stats back to the main process with call_with_stats, where they are merged, together
+    with the values and counters of their latex_to_text_cache, person_name_cache and EntryCache.
+    """
+
+    def __init__(self):
+        # phases outside of a task, like loading the people in Bib2Html.__init__, are collected as "other"
+        self.task = "other"
+        self.phases = {}
+        self.counts = {}
+
+    def add_time(self, name, seconds, calls=1):
+        phase = self.phases.setdefault(self.task, {}).setdefault(name, {'time': 0.0, 'calls': 0})
+        phase['time'] += seconds
+        phase['calls'] += calls
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
 
-    return existing_hrefs
+    def timed_iter(self, name, iterable):
+        """Iterate over iterable, timing the production of every value as phase name.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                value = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start, 0)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield value
+
+    def count(self, name, n=1):
+        counts = self.counts.setdefault(self.task, {})
+        counts[name] = counts.get(name, 0) + n
+
+    def take(self):
+        """
+        :return: the stats collected so far, which are reset
+        """
+        stats = {'phases': self.phases, 'counts': self.counts}
+        self.phases = {}
+        self.counts = {}
+        return stats
+
+    def merge(self, stats):
+        if stats is None:
+            return
+        for task, phases in stats['phases'].items():
+            for name, phase in phases.items():
+                merged = self.phases.setdefault(task, {}).setdefault(name, {'time': 0.0, 'calls': 0})
+                merged['time'] += phase['time']
+                merged['calls'] += phase['calls']
+        for task, counts in stats['counts'].items():
+            for name, n in counts.items():
+                self.counts.setdefault(task, {})[name] = self.counts.get(task, {}).get(name, 0) + n
+        if 'latex_to_text' in stats:
+            latex_to_text_cache.merge(stats['latex_to_text'])
+        person_name_cache.update(stats.get('person_names', {}))
+        if 'entry_cache' in stats:
+            EntryCache.hits += stats['entry_cache']['hits']
+            EntryCache.misses += stats['entry_cache']['misses']
+
+    def to_dict(self):
+        tasks = {}
+        for task in list(self.phases) + [task for task in self.counts if task not in self.phases]:
+            tasks[task] = {'phases': {name: {'time': round(phase['time'], 4), 'calls': phase['calls']}
+                                      for name, phase in self.phases.get(task, {}).items()},
+                           'counts': self.counts.get(task, {})}
+        peak_rss = None
+        if resource is not None:
+            # kilobytes on linux, the peak of the largest worker process for children
+            peak_rss = {'self_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                        'children_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss}
+        entry_cache_total = EntryCache.hits + EntryCache.misses
+        return {'tasks': tasks,
+                'peak_rss': peak_rss,
+                'caches': {'latex_to_text': latex_to_text_cache.get_stats(),
+                           'person_names': {'size': len(person_name_cache)},
+                           'entries': {'hits': EntryCache.hits, 'misses': EntryCache.misses,
+                                       'hit_rate': EntryCache.hits / entry_cache_total if entry_cache_total else 0.0}}}
+
+
+build_stats = BuildStats()
+
+
+# set by init_worker_process in the processes of the worker pools
+in_worker_process = False
+
+
+def init_worker_process():
+    """Initializer of the worker pools, marks the process as worker for call_with_stats. The process id can not tell,
+    since with the spawn and forkserver start methods the workers import this module themselves.
+    """
+    global in_worker_process
+    in_worker_process = True
+
+
+def call_with_stats(task, func, *args):
+    """Call func for the task in a worker process.
+
+    :return: tuple (result of func, stats collected during the call, None if called in the main process)
+    """
+    if not in_worker_process:
+        return func(*args), None
+    build_stats.task = task
+    build_stats.take()
+    latex_to_text_cache.take()
+    person_names_count = len(person_name_cache)
+    entry_cache_hits, entry_cache_misses = EntryCache.hits, EntryCache.misses
+    result = func(*args)
+    stats = build_stats.take()
+    # the caches of the worker are merged into the ones of the main process, which reports and persists them
+    stats['latex_to_text'] = latex_to_text_cache.take()
+    stats['person_names'] = dict(itertools.islice(person_name_cache.items(), person_names_count, None))
+    stats['entry_cache'] = {'hits': EntryCache.hits - entry_cache_hits, 'misses': EntryCache.misses - entry_cache_misses}
+    return result, stats
+
+
+def get_file_hash(file_path):
+    hash = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hash.update(block)
+    return hash.digest()
+
+
+def write_output(output_file_path, chunks, raw=True):
+    """Write the chunks of a rendered template, wrapped in a jekyll raw block unless raw is False, to output_file_path.
+
+    The chunks are streamed into a temporary file that replaces output_file_path only once everything is written,
+    so a failing render never leaves a truncated output behind. If output_file_path already has the same content,
+    it is left untouched (including its mtime), so that incremental jekyll builds and git only see real changes.
+    The written and unchanged files are counted in the build stats.
+    """
+    output_file_path = pathlib.Path(output_file_path)
+    output_file_path.parent.mkdir(exist_ok=True, parents=True)
+    tmp_file_path = output_file_path.with_name(output_file_path.name + ".tmp")
+    try:
+        with open(tmp_file_path, 'w') as outputfile:
+            if raw:
+                outputfile.write("{% raw %}\n")
+            write_time = 0.0
+            for chunk in build_stats.timed_iter("render", chunks):
+                start = time.perf_counter()
+                outputfile.write(chunk)
+                write_time += time.perf_counter() - start
+            if raw:
+                outputfile.write("\n{% endraw %}")
+            build_stats.add_time("write", write_time)
+    except BaseException:
+        tmp_file_path.unlink(missing_ok=True)
+        raise
+    with build_stats.phase("compare"):
+        unchanged = output_file_path.is_file() \
+                    and output_file_path.stat().st_size == tmp_file_path.stat().st_size \
+                    and get_file_hash(output_file_path) == get_file_hash(tmp_file_path)
+    if unchanged:
+        tmp_file_path.unlink()
+        build_stats.count("files_unchanged")
+    else:
+        os.replace(tmp_file_path, output_file_path)
+        build_stats.count("files_written")
+
+
+template_env = None
+
+
+def escape_xml_text(value):
+    """Escape value for an ASCII encoded XML text node, like lxml serializes it.
+    """
+    value = str(value).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\r", "&#13;")
+    return value.encode("ascii", "xmlcharrefreplace").decode("ascii")
+
+
+def escape_xml_attribute(value):
+    """Escape value for a double quoted ASCII encoded XML attribute, like lxml serializes it.
+    """
+    value = escape_xml_text(value).replace('"', "&quot;")
+    return value.replace("\n", "&#10;").replace("\t", "&#9;")
+
+
+def get_template_env(bytecode_cache_path=None):
+    """Template environment shared by everything in this process, created on first use.
+
+    Compiled templates are kept in a FileSystemBytecodeCache (in bytecode_cache_path or jinja2's default temporary
+    folder), so that they are only compiled again when they change. Worker processes forked after
+    Bib2Html.map_jobs preloaded the templates inherit them already compiled.
+    """
+    global template_env
+    if template_env is None:
+        if bytecode_cache_path:
+            pathlib.Path(bytecode_cache_path).mkdir(exist_ok=True, parents=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(str(bytecode_cache_path))
+        else:
+            bytecode_cache = jinja2.FileSystemBytecodeCache()
+        templateLoader = jinja2.FileSystemLoader(searchpath=script_dir + "/templates")
+        # templateEnv = jinja2.Environment(loader=templateLoader, undefined=StrictUndefined) # StrictUndefined for required fields in templates
+        template_env = jinja2.Environment(loader=templateLoader, bytecode_cache=bytecode_cache)
+        template_env.filters['xmltext'] = escape_xml_text
+        template_env.filters['xmlattr'] = escape_xml_attribute
+    return template_env
+
+
+class EntryCache:
+    """On-disk cache for parsed and prepared bib entries, one pickle file per bib file and stage.
+
+    A cached value is only used if it was stored with the same key, which covers the content of the bib file,
+    cache_version, the pybtex version and all parameters the preparation depends on.
+    """
+
+    # loads of cached values in this process, see BuildStats
+    hits = 0
+    misses = 0
+
+    def __init__(self, cache_path):
+        self.cache_path = pathlib.Path(cache_path)
+
+    @staticmethod
+    def get_key(bib_file_path, *params):
+        """
+        :param bib_file_path: bib file whose content is part of the key, None for a key that only depends on params
+        """
+        content_hash = None
+        if bib_file_path:
+            with open(bib_file_path, 'rb') as f:
+                content_hash = hashlib.sha256(f.read()).hexdigest()
+        key_data = json.dumps([content_hash, cache_version, pybtex.__version__, params], sort_keys=True)
+        return hashlib.sha256(key_data.encode()).hexdigest()
+
+    def load(self, name, key):
+        """
+        :return: the cached value or None if there is no value for this key
+        """
+        try:
+            with open(self.cache_path / f"{name}.pickle", 'rb') as f:
+                cached_key, value = pickle.load(f)
+        except Exception:
+            cached_key, value = None, None
+        if cached_key != key:
+            EntryCache.misses += 1
+            return None
+        EntryCache.hits += 1
+        return value
+
+    def dump(self, name, key, value):
+        self.cache_path.mkdir(exist_ok=True, parents=True)
+        tmp_path = self.cache_path / f"{name}.pickle.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path / f"{name}.pickle")
+
+
+class LatexToTextCache:
+    """Bounded LRU memo for the conversion of LaTeX field values to text in Bib2Html.fields_to_text.
+
+    Booktitles, publishers, journals etc. repeat in thousands of entries and are converted only once. The cache
+    counts hits and misses and the time spent converting misses, which gives an estimate of the time saved.
+    """
+
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self.values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.convert_time = 0.0
+        # of a previous run, to estimate the time saved if all values come from the persisted cache
+        self.mean_convert_time = 0.0
+        # values converted since the last take, which a worker process sends back to the main process
+        self.added = []
+
+    def to_text(self, latex):
+        text = self.values.get(latex)
+        if text is not None:
+            self.hits += 1
+            self.values.move_to_end(latex)
+            return text
+
+        start = time.perf_counter()
+        text = str(Text.from_latex(latex))
+        self.convert_time += time.perf_counter() - start
+        self.misses += 1
+        self.add(latex, text)
+        self.added.append(latex)
+        return text
+
+    def add(self, latex, text):
+        self.values[latex] = text
+        if len(self.values) > self.max_size:
+            self.values.popitem(last=False)
+
+    def take(self):
+        """
+        :return: the counters and the values converted since the last call, which are reset, see merge
+        """
+        stats = {'hits': self.hits, 'misses': self.misses, 'convert_time': self.convert_time,
+                 'values': {latex: self.values[latex] for latex in self.added if latex in self.values}}
+        self.hits = self.misses = 0
+        self.convert_time = 0.0
+        self.added = []
+        return stats
+
+    def merge(self, stats):
+        """Add the counters and values of a worker process returned by its take."""
+        self.hits += stats['hits']
+        self.misses += stats['misses']
+        self.convert_time += stats['convert_time']
+        for latex, text in stats['values'].items():
+            self.add(latex, text)
+
+    def get_mean_convert_time(self):
+        return self.convert_time / self.misses if self.misses else self.mean_convert_time
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {'size': len(self.values),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'time_saved': self.hits * self.get_mean_convert_time()}
+
+    def load(self, cache_path):
+        """Fill the memo with the values persisted by dump, if any."""
+        cache = EntryCache(cache_path)
+        cached = cache.load("latex-to-text", cache.get_key(None, "latex-to-text"))
+        if cached:
+            self.values.update(cached['values'])
+            self.mean_convert_time = cached['mean_convert_time']
+
+    def dump(self, cache_path):
+        cache = EntryCache(cache_path)
+        cache.dump("latex-to-text", cache.get_key(None, "latex-to-text"),
+                   {'values': self.values, 'mean_convert_time': self.get_mean_convert_time()})
+
+
+# shared by all tasks of a run, worker processes start with a copy of it
+latex_to_text_cache = LatexToTextCache()
+
+
+def get_templates_hash():
+    """Hash over all template files, used to invalidate cached html when a template changes."""
+    templates_hash = hashlib.sha256()
+    for template_path in sorted(pathlib.Path(script_dir + "/templates").glob("*.jinja2")):
+        templates_hash.update(template_path.name.encode())
+        templates_hash.update(template_path.read_bytes())
+    return templates_hash.hexdigest()
+
+
+def get_entry_fingerprint(block, *params):
+    """Hash over the source text of an entry, as returned by get_entry_blocks, and the params its preparation depends
+    on."""
+    return hashlib.sha256(json.dumps([block, params]).encode()).hexdigest()
+
+
+class CachedEntry:
+    """Stand-in for a prepared entry whose html was rendered in an earlier incremental run: holds just what the
+    sorting and the side files need, so that the pybtex entries of unchanged entries are neither parsed nor cached.
+    """
+
+    def __init__(self, key, fields, sort_key):
+        self.key = key
+        self.fields = fields
+        self.sort_key = sort_key
+
+
+def build_publications(input_path, bib_filename, output_file_path, domain=None, existing_hrefs=None,
+                       cache_path=None, incremental=False, split_years=False, page_size=None, search_index_path=None,
+                       bibtex_path=None, bibtex_url=None, facets_path=None):
+    """Parse, prepare and render a single publications bib file and stream the html to output_file_path.
+
+    Runs in a worker process when Bib2Html is started with jobs > 1, so everything passed in and returned has
+    to be picklable: the parent only gets back the messages for its log.
+
+    :param domain: website domain prefixed to the download hrefs
+    :param existing_hrefs: result of get_existing_hrefs, None to skip the artifact lookup (ir-anthology)
+    :param cache_path: folder of the EntryCache for the prepared entries, None to disable caching
+    :param incremental: only prepare and render entries that changed since the last run, requires cache_path
+    :param split_years: write one file per year into the folder output_file_path, see render_publications_by_year
+    :param search_index_path: folder to write the search index to, see write_search_index, None to skip it
+    :param bibtex_path: folder to write the BibTeX of the entries to, see write_bibtex_files, None to keep it in the
+        textareas of the entries
+    :param bibtex_url: url of the folder bibtex_path on the website
+    :param facets_path: file to write the facets to, see write_facets, None to skip them
+    :return: tuple (files parsed message, whether the html file was written, error message or None)
+    """
+    if incremental and cache_path:
+        return build_publications_incremental(input_path, bib_filename, output_file_path, domain, existing_hrefs,
+                                              cache_path, split_years, page_size, search_index_path,
+                                              bibtex_path, bibtex_url, facets_path)
+
+    files_parsed = f"\n- {bib_filename}"
+    try:
+        cache = EntryCache(cache_path) if cache_path else None
+        grouped = None
+        if cache:
+            cache_key = cache.get_key(input_path + bib_filename, "other", domain, existing_hrefs)
+            grouped = cache.load(bib_filename + ".publications", cache_key)
+        if grouped is None:
+            parser = WebisBibParser(encoding='iso-8859-1')
+            items = (item for _, item in build_stats.timed_iter("parse", parser.iter_file(input_path + bib_filename)))
+            grouped = Bib2Html.group_publication_items(items, domain, existing_hrefs)
+            files_parsed += report_duplicate_keys(parser.duplicate_keys.duplicates)
+            if cache:
+                cache.dump(bib_filename + ".publications", cache_key, grouped)
+        else:
+            files_parsed += " (cached)"
+    except Exception as e:
+        return Bib2Html.format_stacktrace(bib_filename, e), False, None
+
+    error = render_publications(grouped, output_file_path, split_years=split_years, page_size=page_size,
+                                bibtex_url=bibtex_path and bibtex_url)
+    if error is None:
+        write_side_files(grouped, search_index_path, bibtex_path, facets_path)
+    return files_parsed, error is None, error
+
+
+def build_publications_incremental(input_path, bib_filename, output_file_path, domain, existing_hrefs, cache_path,
+                                   split_years=False, page_size=None, search_index_path=None, bibtex_path=None,
+                                   bibtex_url=None, facets_path=None):
+    """Like build_publications, but only entries whose source changed since the last run are parsed, prepared and
+    rendered.
+
+    The bib file is split into entry blocks with get_entry_blocks and the EntryCache stores per key the fingerprint of
+    the block, the rendered html and the fields and sort key of the prepared entry. Only the changed blocks are parsed,
+    together with the @string definitions. If the bib file did not change at all, none of them is parsed.
+    """
+    cache = EntryCache(cache_path)
+    cache_name = bib_filename + ".entries"
+    files_parsed = f"\n- {bib_filename}"
+    try:
+        with open(input_path + bib_filename, encoding='iso-8859-1') as f:
+            bib_string = f.read()
+        strings, blocks = get_entry_blocks(bib_string)
+        templates_hash = get_templates_hash()
+        bibtex_url = bibtex_path and bibtex_url
+        # the @strings apply to all entries and the rendered entries link their BibTeX files
+        cache_key = cache.get_key(None, "other", domain, existing_hrefs is None, templates_hash, bibtex_url, strings)
+        file_key = cache.get_key(input_path + bib_filename, "other", domain, existing_hrefs, templates_hash)
+        cached = cache.load(cache_name, cache_key) or {'file_key': None, 'entries': {}}
+
+        if cached['file_key'] == file_key:
+            entries = cached['entries']
+            files_parsed += " (cached)"
+        else:
+            try:
+                entries, changed_blocks, duplicates = get_changed_entries(blocks, cached['entries'], existing_hrefs)
+                changed = parse_changed_entries(strings, changed_blocks, input_path + bib_filename)
+            except ValueError as e:
+                bib2html_logger.warning(f"Could not build {bib_filename} incrementally ({e}), building it as a whole.")
+                return build_publications(input_path, bib_filename, output_file_path, domain, existing_hrefs,
+                                          split_years=split_years, page_size=page_size,
+                                          search_index_path=search_index_path, bibtex_path=bibtex_path,
+                                          bibtex_url=bibtex_url, facets_path=facets_path)
+            for key, item in changed.items():
+                entries[key] = (entries[key][0], None, item, None)
+            Bib2Html.group_publication_items(changed.values(), domain, existing_hrefs)
+            files_parsed += f" ({len(changed)} of {len(entries)} entries changed)"
+            files_parsed += report_duplicate_keys(duplicates)
+    except Exception as e:
+        return Bib2Html.format_stacktrace(bib_filename, e), False, None
+
+    grouped = {}
+    for key, (fingerprint, html, item, sort_key) in entries.items():
+        if html is not None:
+            item = CachedEntry(key, item, sort_key)
+        elif item is None or not Bib2Html.is_listed_publication(item):
+            continue
+        grouped.setdefault(item.fields['year'], []).insert(0, item)
+    rendered_entries = {key: html for key, (_, html, _, _) in entries.items() if html is not None}
+    error = render_publications(grouped, output_file_path, rendered_entries, split_years, page_size, bibtex_url)
+    if error is None:
+        write_side_files(grouped, search_index_path, bibtex_path, facets_path)
+        records = {}
+        for key, (fingerprint, html, item, sort_key) in entries.items():
+            if html is None and item is not None and Bib2Html.is_listed_publication(item):
+                html, item, sort_key = rendered_entries[key], item.fields, item.sort_key
+            elif html is None:
+                item = None
+            records[key] = (fingerprint, html, item, sort_key)
+        cache.dump(cache_name, cache_key, {'file_key': file_key, 'entries': records})
+    return files_parsed, error is None, error
+
+
+def get_changed_entries(blocks, cached_entries, existing_hrefs):
+    """Compare the entry blocks of a bib file with the fingerprints cached by an earlier incremental run.
+
+    :param blocks: list of tuples (key, block, line) as returned by get_entry_blocks
+    :param cached_entries: dict key -> tuple (fingerprint, html, fields, sort_key), html is None for entries that
+        are not listed
+    :return: tuple (dict key -> cached tuple, or tuple (fingerprint, None, None, None) for changed entries, in the
+        order of the file, list of tuples (key, scanned key, block, line) of the changed entries, renamed duplicates)
+    """
+    entries = {}
+    changed_blocks = []
+    duplicate_keys = DuplicateKeys()
+    for scanned_key, block, line in blocks:
+        if scanned_key is None:
+            raise ValueError(f"could not scan the key of {block[:40]!r}")
+        key = duplicate_keys.resolve(scanned_key)
+        bibid = key.replace(":", "_")
+        hrefs = existing_hrefs.get(bibid) if existing_hrefs is not None else None
+        fingerprint = get_entry_fingerprint(block, key, hrefs)
+        cached_entry = cached_entries.get(key)
+        if cached_entry and cached_entry[0] == fingerprint:
+            entries[key] = cached_entry
+        else:
+            entries[key] = (fingerprint, None, None, None)
+            changed_blocks.append((key, scanned_key, block, line))
+    return entries, changed_blocks, duplicate_keys.duplicates
+
+
+def parse_changed_entries(strings, changed_blocks, bib_file_path):
+    """Parse the changed entry blocks of a bib file on their own. The blocks are moved to their lines in the file with
+    blank lines, so that the parser warnings point to the right lines.
+
+    :param strings: @string definitions of the file, as returned by get_entry_blocks
+    :param changed_blocks: see get_changed_entries
+    :return: dict key -> parsed (not yet prepared) entry
+    """
+    if not changed_blocks:
+        return {}
+    parser = WebisBibParser(encoding='iso-8859-1')
+    parser.filename = bib_file_path
+    parts = [strings]
+    lines = strings.count("\n") + 1
+    for _, _, block, line in changed_blocks:
+        parts.append("\n" * max(line - lines, 0))
+        parts.append(block)
+        lines = max(line, lines) + block.count("\n")
+    bib_string = "".join(parts)
+    items = [item for _, item in build_stats.timed_iter("parse", parser.iter_entries(bib_string))]
+    if parser.duplicate_keys.keys != [scanned_key for _, scanned_key, _, _ in changed_blocks]:
+        raise ValueError("the scanned keys differ from the parsed ones")
+    changed = {}
+    # the duplicate keys are renamed in get_changed_entries, over all entries of the file
+    for (key, _, _, _), item in zip(changed_blocks, items):
+        item.key = key
+        changed[key] = item
+    return changed
+
+
+def iter_rendered_entries(entry_template, entries, rendered_entries=None, bibtex_src=None):
+    """
+    :param rendered_entries: dict entry key -> html of entries that are already rendered, the html of all other
+        entries is rendered and added to it. If None, nothing is kept in memory after an entry is yielded.
+    :param bibtex_src: url of the BibTeX file of the entries, None to render their BibTeX into their textareas
+    """
+    for entry in entries:
+        html = rendered_entries.get(entry.key) if rendered_entries is not None else None
+        if html is None:
+            html = entry_template.render(entry=entry, bibtex_src=bibtex_src)
+            if rendered_entries is not None:
+                rendered_entries[entry.key] = html
+        yield html
+
+
+def get_bibtex_src(bibtex_url, year):
+    """
+    :return: url of the BibTeX file of a year written by write_bibtex_files, None if bibtex_url is None
+    """
+    return f"{bibtex_url}/{year}.json" if bibtex_url else None
+
+
+def render_publications(grouped, output_file_path, rendered_entries=None, split_years=False, page_size=None,
+                        bibtex_url=None):
+    """Render the publications list entry by entry and stream it to output_file_path.
+
+    :param grouped: dict year -> list of prepared entries, as returned by Bib2Html.group_publication_items
+    :param rendered_entries: see iter_rendered_entries
+    :param split_years: treat output_file_path as folder and write one file per year, see render_publications_by_year
+    :param bibtex_url: url of the BibTeX files written by write_bibtex_files, None to render the BibTeX of the
+        entries into their textareas
+    :return: error message or None
+    """
+    Bib2Html.sort_publication_items(grouped)
+    if split_years:
+        return render_publications_by_year(grouped, output_file_path, rendered_entries, page_size, bibtex_url)
+
+    env = get_template_env()
+    entry_template = env.get_template("publications_entry.html.jinja2")
+    bib_entries = ((year, iter_rendered_entries(entry_template, entries, rendered_entries,
+                                                get_bibtex_src(bibtex_url, year)))
+                   for year, entries in sorted(grouped.items(), reverse=True))
+    try:
+        write_output(output_file_path, env.get_template("publications.html.jinja2").generate(bib_entries=bib_entries))
+    except jinja2.exceptions.UndefinedError as e:
+        return "Error in: " + str(e) + "\n" + traceback.format_exc()
+    return None
+
+
+def render_publications_by_year(grouped, output_folder_path, rendered_entries=None, page_size=None, bibtex_url=None):
+    """Write every year container of the publications list to its own file in output_folder_path, so that the page
+    can load the years on demand. Years with more than page_size entries are split into several files, each holding
+    a year container with the next page_size entries.
+
+    The files are served as static files and thus not wrapped in a jekyll raw block. The manifest.json lists the
+    files per year, newest year first. Files of earlier runs that are no longer in the manifest are removed.
+
+    :param grouped: dict year -> list of sorted, prepared entries
+    :return: error message or None
+    """
+    env = get_template_env()
+    entry_template = env.get_template("publications_entry.html.jinja2")
+    year_template = env.get_template("publications.html.jinja2")
+    output_folder_path = pathlib.Path(output_folder_path)
+
+    manifest = {'page_size': page_size, 'years': []}
+    try:
+        for year, entries in sorted(grouped.items(), reverse=True):
+            pages = [entries]
+            if page_size:
+                pages = [entries[i:i + page_size] for i in range(0, len(entries), page_size)]
+            filenames = [f"{year}.html"] if len(pages) == 1 else [f"{year}-{i + 1}.html" for i in range(len(pages))]
+            for filename, page_entries in zip(filenames, pages):
+                bib_entries = [(year, iter_rendered_entries(entry_template, page_entries, rendered_entries,
+                                                            get_bibtex_src(bibtex_url, year)))]
+                write_output(output_folder_path / filename, year_template.generate(bib_entries=bib_entries), raw=False)
+            manifest['years'].append({'year': year, 'count': len(entries), 'files': filenames})
+    except jinja2.exceptions.UndefinedError as e:
+        return "Error in: " + str(e) + "\n" + traceback.format_exc()
+
+    write_output(output_folder_path / "manifest.json", [json.dumps(manifest, indent=1)], raw=False)
+    remove_stale_files(output_folder_path, "*.html", {filename for year in manifest['years'] for filename in year['files']})
+    return None
+
+
+def remove_stale_files(output_folder_path, pattern, filenames):
+    """Remove the files matching pattern in output_folder_path that were written by an earlier run, but not by this one.
+
+    :param filenames: names of the files written by this run
+    """
+    for path in pathlib.Path(output_folder_path).glob(pattern):
+        if path.name not in filenames:
+            path.unlink()
+
+
+def write_side_files(grouped, search_index_path=None, bibtex_path=None, facets_path=None):
+    """Write the static files that are served next to a publications list, see build_publications.
+
+    :param grouped: dict year -> list of sorted, prepared entries
+    """
+    if search_index_path:
+        write_search_index(grouped, search_index_path)
+    if bibtex_path:
+        write_bibtex_files(grouped, bibtex_path)
+    if facets_path:
+        write_facets(grouped, facets_path)
+
+
+def write_facets(grouped, output_file_path):
+    """Write the facets of a publications list as a static JSON file, so that the page can list them with their counts
+    right away and filter the entries by intersecting the bibids of the selected facets:
+    {"entries": count, "years": {year: count}, "authors": {author: [bibid, ...]}, "venues": {venue: [bibid, ...]}}.
+
+    The authors and venues (booktitle or journal) are ordered by their number of entries, the years newest first.
+
+    :param grouped: dict year -> list of sorted, prepared entries
+    """
+    with build_stats.phase("facets"):
+        years = {}
+        authors = {}
+        venues = {}
+        for year, entries in sorted(grouped.items(), reverse=True):
+            years[year] = len(entries)
+            for item in entries:
+                bibid = item.fields['bibid']
+                for author in dict.fromkeys(filter(None, item.fields.get('data_author', "").split(","))):
+                    authors.setdefault(author, []).append(bibid)
+                venue = item.fields.get('booktitle') or item.fields.get('journal')
+                if venue:
+                    venues.setdefault(venue, []).append(bibid)
+        facets = {'entries': sum(years.values()), 'years': years,
+                  'authors': dict(sorted(authors.items(), key=lambda facet: (-len(facet[1]), facet[0]))),
+                  'venues': dict(sorted(venues.items(), key=lambda facet: (-len(facet[1]), facet[0])))}
+    write_output(output_file_path, [json.dumps(facets, separators=(",", ":"))], raw=False)
+
+
+def write_search_index(grouped, output_folder_path):
+    """Write an inverted index of a publications list as static JSON files, so that the page can look up the entries
+    matching a search term with a few small requests instead of scanning the attributes of all bib-entry divs.
+
+    The terms are the lowercase words of the search_index_fields, sharded by their first search_index_prefix_length
+    characters. A shard maps each term to the bibids of the matching entries per field, in the order of the page:
+    {"term": {"author": [bibid, ...], "title": [...]}}. The manifest.json lists the fields and the shard file of every
+    prefix, named after its UTF-8 bytes in hex. Stale shards are removed.
+
+    :param grouped: dict year -> list of sorted, prepared entries
+    """
+    output_folder_path = pathlib.Path(output_folder_path)
+    with build_stats.phase("search_index"):
+        shards = {}
+        entries_count = 0
+        for year, entries in sorted(grouped.items(), reverse=True):
+            for item in entries:
+                for field, entry_field in search_index_fields.items():
+                    value = item.fields.get(entry_field)
+                    if not value:
+                        continue
+                    for term in dict.fromkeys(search_term_regex.findall(value.lower())):
+                        postings = shards.setdefault(term[:search_index_prefix_length], {}).setdefault(term, {})
+                        postings.setdefault(field, []).append(item.fields['bibid'])
+                entries_count += 1
+
+        manifest = {'prefix_length': search_index_prefix_length, 'fields': list(search_index_fields),
+                    'entries': entries_count, 'shards': {}}
+        for prefix in sorted(shards):
+            # named after the prefix, so that a new prefix does not rename (and rewrite) the other shards
+            filename = f"{prefix.encode().hex()}.json"
+            manifest['shards'][prefix] = filename
+            write_output(output_folder_path / filename, [json.dumps(shards[prefix], separators=(",", ":"))], raw=False)
+    write_output(output_folder_path / "manifest.json", [json.dumps(manifest, indent=1)], raw=False)
+    remove_stale_files(output_folder_path, "*.json", set(manifest['shards'].values()) | {"manifest.json"})
+
+
+def write_bibtex_files(grouped, output_folder_path):
+    """Write the BibTeX of the entries of a publications list to one JSON file per year, bibid -> BibTeX, that the
+    page fetches when a bib link is toggled. The textareas of the entries link their file, see get_bibtex_src.
+
+    :param grouped: dict year -> list of prepared entries
+    """
+    output_folder_path = pathlib.Path(output_folder_path)
+    with build_stats.phase("bibtex_files"):
+        filenames = set()
+        for year, entries in grouped.items():
+            filenames.add(f"{year}.json")
+            bibtex = {item.fields['bibid']: item.fields['raw'] for item in entries}
+            write_output(output_folder_path / f"{year}.json", [json.dumps(bibtex, indent=1)], raw=False)
+    remove_stale_files(output_folder_path, "*.json", filenames)
+
+
+def write_dataset_page(output_file_path, key, item):
+    """Render the dataset page of the data entry item and write it to output_file_path.
+    """
+    t = get_template_env().get_template("dataset_page.html.jinja2")
+    write_output(output_file_path, t.generate(key=key, item=item, has_value=Bib2Html.has_value), raw=False)
+
+
+def get_entry_starts(bib_string):
+    """Find the @ of every entry (and @string, @preamble, @comment) of a bib string. Like the pybtex parser, an @ only
+    starts an entry outside of other entries, so an @ at the start of a line within a field value is skipped. Also
+    like the pybtex parser, the body of an @comment is not skipped, entries within it are found.
+
+    :return: list of the positions of the @
+    """
+    starts = []
+    # the delimiter that closes the current entry, None outside of entries
+    closing = None
+    # whether an @ was found whose opening delimiter is still missing
+    in_command = False
+    depth = 0
+    for match in bib_delimiter_regex.finditer(bib_string):
+        delimiter = match.group()
+        if closing is None:
+            if delimiter == "@":
+                starts.append(match.start())
+                in_command = True
+            elif in_command and delimiter in "{(":
+                in_command = False
+                if bib_string[starts[-1] + 1:match.start()].strip().lower() != "comment":
+                    closing = "}" if delimiter == "{" else ")"
+                    depth = 0
+        elif delimiter == "{":
+            depth += 1
+        elif delimiter == closing and depth == 0:
+            closing = None
+        elif delimiter == "}":
+            depth -= 1
+    return starts
+
+
+def split_bib_string(bib_string, shards):
+    """Split a bib file into at most `shards` chunks of roughly equal size at @entry{ boundaries.
+
+    @string definitions are repeated at the top of every chunk so that each chunk can be parsed on its own.
+    """
+    starts = get_entry_starts(bib_string)
+    blocks = [bib_string[start:end] for start, end in zip([0] + starts, starts + [len(bib_string)])]
+    strings = "".join(b for b in blocks if re.match(r'\s*@string\s*[{(]', b, re.IGNORECASE))
+    blocks = [b for b in blocks if not re.match(r'\s*@string\s*[{(]', b, re.IGNORECASE)]
+
+    chunk_size = len(bib_string) / shards
+    chunks = [[]]
+    current_size = 0
+    for block in blocks:
+        if current_size >= chunk_size and len(chunks) < shards:
+            chunks.append([])
+            current_size = 0
+        chunks[-1].append(block)
+        current_size += len(block)
+    return [strings + "".join(chunk) for chunk in chunks]
+
+
+def get_entry_blocks(bib_string):
+    """Split a bib file into the source text of its entries, for the fingerprints of build_publications_incremental.
+
+    :return: tuple (the @string definitions of the file, list of tuples (key, block, line of the block) in file order,
+        key is None for entries whose key could not be scanned). @preamble and @comment blocks are left out.
+    """
+    starts = get_entry_starts(bib_string)
+    strings = ""
+    blocks = []
+    line = bib_string.count("\n", 0, starts[0]) + 1 if starts else 1
+    for start, end in zip(starts, starts[1:] + [len(bib_string)]):
+        block = bib_string[start:end]
+        match = bib_key_regex.match(block)
+        command = match.group(1).lower() if match else None
+        if command == 'string':
+            strings += block
+        elif command not in ('preamble', 'comment'):
+            blocks.append((match and (match.group(2) or match.group(3)), block, line))
+        line += block.count("\n")
+    return strings, blocks
+
+
+def get_bib_keys(bib_string):
+    """Scan the keys of the entries of a bib string without parsing it.
+
+    :return: list of the keys in file order, None for entries whose key could not be scanned
+    """
+    keys = []
+    for start in get_entry_starts(bib_string):
+        match = bib_key_regex.match(bib_string, start)
+        if match is None:
+            keys.append(None)
+        elif match.group(1).lower() not in ('string', 'preamble', 'comment'):
+            keys.append(match.group(2) or match.group(3))
+    return keys
+
+
+def prepare_publications_chunk(bib_string, duplicate_keys=None):
+    """Parse and prepare one chunk returned by split_bib_string, runs in a worker process.
+
+    :param duplicate_keys: DuplicateKeys with the keys of the previous chunks
+    :return: tuple (dict year -> list of prepared entries, keys of the chunk before renaming, renamed duplicates)
+    """
+    parser = WebisBibParser(duplicate_keys=duplicate_keys)
+    items = (item for _, item in build_stats.timed_iter("parse", parser.iter_entries(bib_string)))
+    grouped = Bib2Html.group_publication_items(items)
+    return grouped, parser.duplicate_keys.keys, parser.duplicate_keys.duplicates
 
 
 class Bib2Html:
@@ -246,6 +1421,9 @@ class Bib2Html:
                        'affiliated-corpora': "Affiliated Corpora",
                        'other-corpora': "Other Corpora"}
     
+    # fields of data entries linked in the access column of the data tables
+    data_link_fields = ['browserurl', 'zenodourl', 'googleurl', 'internetarchiveurl']
+
     people_categories = {'secretaries': 'Secretary',
                          'assistants': 'Assistants',
                          'former-assistants': 'Former Assistant',
@@ -254,76 +1432,61 @@ class Bib2Html:
                          'head': 'Head',
                          'student-assistants': 'student-assistants'}
 
-    dataset_page_template_filename = script_dir + "/templates/dataset_page.html.jinja2"
-    data_table_template_filename = script_dir + "/templates/data_table.html.jinja2"
-    bib_list_template_filename = script_dir + "/templates/publications.html.jinja2"
-    people_template_filename = script_dir + "/templates/people.html.jinja2"
-
-    def __init__(self, input_path, output_path):
+    def __init__(self, input_path, output_path, jobs=1, shards=1, cache_path=None, incremental=False,
+                 split_years=False, page_size=None, artifacts_path=None, artifacts_ttl=3600, timings_path=None,
+                 search_index=False, bibtex_files=False, facets=False):
         self.input_path = input_path
         self.output_path = output_path
+        self.jobs = jobs
+        self.shards = shards
+        self.cache_path = cache_path
+        self.incremental = incremental
+        self.split_years = split_years
+        self.page_size = page_size
+        self.search_index = search_index
+        self.bibtex_files = bibtex_files
+        self.facets = facets
+        self.artifact_index = ArtifactIndex(artifacts_path, cache_path, artifacts_ttl)
+        self.timings_path = timings_path
 
         self.log_capture_string = io.StringIO()
         self.ch = logging.StreamHandler(self.log_capture_string)
         self.ch.setLevel(logging.INFO)
         bib2html_logger.addHandler(self.ch)
 
-        self.bib_data_people = self.load_bib_file("webis-people.bib")
+        self._bib_data_people = None
         self.html_files_count = 0
+        self.dataset_page_executor = None
+        self.dataset_page_futures = []
+        self.dataset_page_filenames = []
 
-        templateLoader = jinja2.FileSystemLoader(searchpath=script_dir + "/templates")
-        # templateEnv = jinja2.Environment(loader=templateLoader, undefined=StrictUndefined) # StrictUndefined for required fields in templates
-        self.templateEnv = jinja2.Environment(loader=templateLoader)
+        self.templateEnv = get_template_env(pathlib.Path(cache_path) / "jinja2" if cache_path else None)
+        if cache_path:
+            latex_to_text_cache.load(cache_path)
 
     def __del__(self):
         bib2html_logger.removeHandler(self.ch)
 
-    def get_table(self, category_id, webis_people, output_path):
-        """
-
-        :param category_id:
-        :param bib_data:
-        :return:
+    @property
+    def bib_data_people(self):
+        """webis-people.bib, parsed on first use since only some tasks link people.
         """
-        with open(self.data_table_template_filename, 'r') as file:
-            data_table_template = file.read()
-
-        t = Template(data_table_template)
-        output = t.render(category_id=category_id, category_name=self.data_categories[category_id])
-
-        table = lxml.html.fragment_fromstring(output)
-        for i, item in enumerate(webis_people):
-            row = self.get_row(item.key, item, output_path)
-            table.find("tbody").append(row)
-
-        et.indent(table, space="\t", level=0)
+        if self._bib_data_people is None:
+            self._bib_data_people = self.load_bib_file("webis-people.bib")
+        return self._bib_data_people
 
-        return et.tostring(table, pretty_print=True).decode("iso-8859-1").replace("CLASS", "class")
-
-    def create_people_page(self, category_id, webis_people, output_path):
+    def get_table(self, category_id, webis_people, output_path):
         """
 
         :param category_id:
-        :param webis-people:
+        :param bib_data:
         :return:
         """
-        with open(self.people_template_filename, 'r') as file:
-            people_template = file.read()
-
-        t = Template(people_template)
-        output = t.render(category_id=category_id, category_name=self.people_categories[category_id])
-
-        entry = lxml.html.fragment_fromstring(output)
-        for i, item in enumerate(webis_people):
-            row = self.get_row(item.key, item, output_path)
-            entry.find("div").append(row)
-
-        et.indent(entry, space="\t", level=0)
-
-        return et.tostring(entry, pretty_print=True).decode("iso-8859-1").replace("CLASS", "class")
-
-
-
+        rows = [self.get_row(item.key, item, output_path) for item in webis_people]
+        build_stats.count("entries", len(rows))
+        with build_stats.phase("render"):
+            t = self.templateEnv.get_template("data_table.html.jinja2")
+            return t.render(category_id=category_id, category_name=self.data_categories[category_id], rows=rows) + "\n"
 
     def get_jsonld(self, item):
         """ todo: switch to PyLD"""
@@ -392,79 +1555,54 @@ class Bib2Html:
 
         :param key:
         :param item:
-        :return:
+        :return: dict of the values of the row in data_table.html.jinja2
         """
-
-        def ATTR(key, value):
-            return {key: value}
-
         dataset_url = ""
         if self.has_value(item, 'synopsishtml'):
             dataset_page_filename = self.create_dataset_page(key, item, output_path)
             dataset_url = "data/" + dataset_page_filename
-            self.html_files_count += 1
         elif self.has_value(item, 'url'):
             dataset_url = item.fields['url']
 
-        self.fields_to_text(item)
-        row = TR(
-            TD(id=key),
-            TD(A(item.fields['title'], href=dataset_url)) if dataset_url else TD(item.fields['title']),
-            TD(item.fields['publisher']),
-            TD(item.fields['year'], CLASS="uk-text-center"),
-            TD(item.fields['sizebytescompressed'], CLASS="numeric"),
-            TD(item.fields['sizeunits'], CLASS="numeric"),
-            TD(item.fields['sizeunittype']),
-            TD(item.fields['tasks']),
-            TD(
-                A(I((""), ATTR("aria-hidden", "true"), ATTR("class", "fa fa-eye uk-text-muted")), ATTR("class", "uk-link-reset"), title="Browser",
-                  href=item.fields['browserurl']) if self.has_value(item, 'browserurl') else "",
-                A(IMG(src="data/img/zenodo-icon.png", alt="Zenodo"), ATTR("class", "uk-link-reset"), title="Download: Zenodo",
-                  href=item.fields['zenodourl']) if self.has_value(item, 'zenodourl') else "",
-                A(IMG(src="data/img/google-icon.png", alt="Google Dataset Search"), ATTR("class", "uk-link-reset"), title="Indexed: Google",
-                  href=item.fields['googleurl']) if self.has_value(item, 'googleurl') else "",
-                A(IMG(src="data/img/ia-icon.png", alt="Internet Archive"), ATTR("class", "uk-link-reset"), title="Internet Archive",
-                  href=item.fields['internetarchiveurl']) if self.has_value(item, 'internetarchiveurl') else "",
-                CLASS="uk-text-right"
-            )
-        )
-
-        # print(et.tostring(row, pretty_print=False, with_tail=False))
-        return row
+        with build_stats.phase("latex_to_text"):
+            self.fields_to_text(item)
+        return {'key': key,
+                'url': dataset_url,
+                'title': item.fields['title'],
+                'publisher': item.fields['publisher'],
+                'year': item.fields['year'],
+                'sizebytescompressed': item.fields['sizebytescompressed'],
+                'sizeunits': item.fields['sizeunits'],
+                'sizeunittype': item.fields['sizeunittype'],
+                'tasks': item.fields['tasks'],
+                'links': {field: item.fields[field] for field in self.data_link_fields if self.has_value(item, field)}}
 
     def create_dataset_page(self, key, item, output_path):
-        """
+        """Prepare the dataset page of item and hand it to self.dataset_page_executor, which renders and writes it
+        while the data tables are built.
 
         :param key:
         :param item:
-        :return:
+        :return: filename of the dataset page
         """
-        with open(self.dataset_page_template_filename, 'r') as file:
-            dataset_page_template = file.read()
-
         dataset_page_filename = key + ".html"
 
-        item.fields['people'] = self.get_people(item)
+        with build_stats.phase("persons"):
+            item.fields['people'] = self.get_people(item)
         item.fields['synopsis'] = re.sub('<[^>]+>', '', item.fields['synopsishtml']).strip()
-        item.fields['raw'] = get_raw_bib_entry(item)
+        with build_stats.phase("raw_bib"):
+            item.fields['raw'] = get_raw_bib_entry(item)
         item.fields['jsonld'] = self.get_jsonld(item)
 
-        t = Template(dataset_page_template)
-        output = t.render(key=key, item=item, has_value=self.has_value)
-
+        # the table converts the fields of item to text afterwards, the page is rendered from a copy of them
+        page_item = Entry(item.original_type, fields=item.fields)
         output_file_path = pathlib.Path(self.output_path + "/" + output_path + "/data/" + dataset_page_filename)
-        output_file_path.parent.mkdir(exist_ok=True, parents=True)
-        with open(output_file_path, 'w') as f:
-            f.write(output)
-
+        self.dataset_page_futures.append(self.dataset_page_executor.submit(call_with_stats, build_stats.task,
+                                                                           write_dataset_page, output_file_path, key,
+                                                                           page_item))
+        self.dataset_page_filenames.append(dataset_page_filename)
         return dataset_page_filename
 
-    def get_href_if_exists(self, domain, resource_type, item):
-        href = self.existing_hrefs[resource_type].get(item.key.replace(':', '_'), False)
-        if href:
-            item.fields[resource_type + '_href'] = domain + "/" + href
-        return item
-
     def get_people(self, item):
         """
 
@@ -496,9 +1634,57 @@ class Bib2Html:
         return authornames
 
     def load_bib_file(self, filename, bib_type="other",encoding='iso-8859-1'):
-        return WebisBibParser(encoding=encoding, bib_type=bib_type).parse_file(self.input_path + filename)
+        with build_stats.phase("parse"):
+            if not self.cache_path:
+                return self.parse_bib_file(filename, bib_type, encoding)
+
+            cache = EntryCache(self.cache_path)
+            cache_name = f"{filename}.{bib_type}.{encoding}"
+            cache_key = cache.get_key(self.input_path + filename, bib_type, encoding)
+            bib_data = cache.load(cache_name, cache_key)
+            if bib_data is None:
+                bib_data = self.parse_bib_file(filename, bib_type, encoding)
+                cache.dump(cache_name, cache_key, bib_data)
+            return bib_data
+
+    def parse_bib_file(self, filename, bib_type, encoding):
+        parser = WebisBibParser(encoding=encoding, bib_type=bib_type)
+        bib_data = parser.parse_file(self.input_path + filename)
+        duplicates = parser.duplicate_keys.duplicates
+        if duplicates:
+            bib2html_logger.warning(f"Duplicate keys in {filename}:{report_duplicate_keys(duplicates)}")
+        return bib_data
+
+    def preload_templates(self):
+        """Compile all templates before worker processes are forked, so that they inherit them.
+        """
+        for template_name in self.templateEnv.list_templates(extensions=["jinja2"]):
+            self.templateEnv.get_template(template_name)
 
-    def format_stacktrace(self, bib_filename, exception):
+    def map_jobs(self, func, args_list, size=None):
+        """Call func for every argument tuple, in a process pool if more than one job is configured.
+
+        :param args_list: argument tuples, may be a generator if size is given, then every call is started as soon
+            as its arguments are yielded
+        :param size: number of argument tuples, len(args_list) by default
+        :return: list of results in the order of args_list
+        """
+        size = len(args_list) if size is None else size
+        if self.jobs > 1 and size > 1:
+            self.preload_templates()
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(self.jobs, size), initializer=init_worker_process) as executor:
+                futures = [executor.submit(call_with_stats, build_stats.task, func, *args) for args in args_list]
+                results = []
+                for future in futures:
+                    result, stats = future.result()
+                    build_stats.merge(stats)
+                    results.append(result)
+                return results
+        return [func(*args) for args in args_list]
+
+    @staticmethod
+    def format_stacktrace(bib_filename, exception):
         traceback_str = ' '.join(traceback.format_tb(exception.__traceback__)) + str(exception)
         if __name__ != '__main__':
             message = f"\n- Error in: {bib_filename} [please check bib files, see <a download='bib2html_error.txt' href='data:text/plain;base64,{base64.b64encode(traceback_str.encode()).decode()}'>stacktrace</a>]"
@@ -530,27 +1716,40 @@ class Bib2Html:
                 continue
         bib2html_logger.info("""\nBib files parsed: """ + files_parsed_string)
 
-        # Create data tables
+        # Create data tables, the dataset pages are rendered and written by worker processes in the meantime
         output = ""
         grouped = {}
         self.html_files_count += 1
-        for key, item in bib_data['data-webis'].entries.items():
-            if not item.fields['category'] in grouped:
-                grouped[item.fields['category']] = []
-            grouped[item.fields['category']].append(item)
-        for category in self.data_categories.keys():
-            if category in grouped:
-                entries = grouped[category]
-                entries = sorted(entries, key=lambda x: x.fields['title'].lower())
-                output += self.get_table(category, entries, output_path)
-
-        bib_data_other_sorted = sorted(bib_data['data-other'].entries.values(), key=lambda x: x.fields['title'].lower())
-        output += self.get_table("other-corpora", bib_data_other_sorted, output_path)
+        if self.jobs > 1:
+            self.preload_templates()
+            from concurrent.futures import ProcessPoolExecutor
+            self.dataset_page_executor = ProcessPoolExecutor(max_workers=self.jobs, initializer=init_worker_process)
+        else:
+            self.dataset_page_executor = ThreadPoolExecutor(max_workers=1)
+        self.dataset_page_futures = []
+        self.dataset_page_filenames = []
+        with self.dataset_page_executor:
+            for key, item in bib_data['data-webis'].entries.items():
+                if not item.fields['category'] in grouped:
+                    grouped[item.fields['category']] = []
+                grouped[item.fields['category']].append(item)
+            for category in self.data_categories.keys():
+                if category in grouped:
+                    entries = grouped[category]
+                    entries = sorted(entries, key=lambda x: x.fields['title'].lower())
+                    output += self.get_table(category, entries, output_path)
+
+            bib_data_other_sorted = sorted(bib_data['data-other'].entries.values(), key=lambda x: x.fields['title'].lower())
+            output += self.get_table("other-corpora", bib_data_other_sorted, output_path)
+
+            for future in self.dataset_page_futures:
+                build_stats.merge(future.result()[1])
+                self.html_files_count += 1
+        # pages of data entries that were removed or renamed since the last run
+        remove_stale_files(self.output_path + "/" + output_path + "/data", "*.html", set(self.dataset_page_filenames))
 
         output_file_path = pathlib.Path(self.output_path + "/" + output_path + f"/_includes/bib-data.html")
-        output_file_path.parent.mkdir(exist_ok=True, parents=True)
-        with open(output_file_path, 'w') as outputfile:
-            outputfile.write("{% raw %}\n" + output + "\n{% endraw %}")
+        write_output(output_file_path, [output])
 
 
     def publications(self, bib_files={}, output_path={}):
@@ -559,72 +1758,79 @@ class Bib2Html:
         :return:
         """
         bib2html_logger.info("\n1. Update publications.")
-        with open(self.bib_list_template_filename, 'r') as file:
-            bib_list_template = file.read()
 
-        bib_publications = dict()
-        files_parsed_string = ""
-        for k, bib_filename in bib_files.items():
-            try:
-                bib_publications[k] = self.load_bib_file(bib_filename)
-                files_parsed_string += f"\n- {bib_filename}"
-            except Exception as e:
-                files_parsed_string += self.format_stacktrace(bib_filename, e)
-                continue
-        bib2html_logger.info("""\nBib files parsed: """ + files_parsed_string)
+        websites = [output_publications_filename.split("-")[1] for output_publications_filename in bib_files]
+        self.artifact_index.start_run()
+        self.artifact_index.prefetch({(github_webis[website]['username'], github_webis[website]['repo'])
+                                      for website in websites})
+
+        def get_args_list():
+            # yields the arguments of an output as soon as its listing is loaded, the other listings are loaded
+            # in the meantime
+            for website, (output_publications_filename, bib_filename) in zip(websites, bib_files.items()):
+                with build_stats.phase("artifacts_listing"):
+                    existing_hrefs = self.artifact_index.get_existing_hrefs(github_webis[website]['username'],
+                                                                            github_webis[website]['repo'],
+                                                                            github_webis[website]['directory'])
+                output_file_path = self.output_path + "/" + output_path[output_publications_filename] + f"/_includes/{output_publications_filename}.html"
+                search_index_path = self.get_search_index_path(output_path[output_publications_filename],
+                                                               output_publications_filename)
+                bibtex_path, bibtex_url = self.get_bibtex_files_path(output_path[output_publications_filename],
+                                                                     output_publications_filename)
+                facets_path = self.get_facets_path(output_path[output_publications_filename],
+                                                   output_publications_filename)
+                yield (self.input_path, bib_filename, output_file_path, github_webis[website]['domain'],
+                       existing_hrefs, self.cache_path, self.incremental, False, None, search_index_path,
+                       bibtex_path, bibtex_url, facets_path)
+        results = self.map_jobs(build_publications, get_args_list(), len(bib_files))
+
+        self.log_publications(bib_files, results)
+
+    def get_search_index_path(self, site_path, output_publications_filename):
+        """
+        :return: folder of the search index of a publications list, served next to its page, None if disabled
+        """
+        if not self.search_index:
+            return None
+        return self.output_path + "/" + site_path + f"/search-index/{output_publications_filename}"
 
-        files_list_str = ""
-        for output_publications_filename, bib_publications in bib_publications.items():
-            website = output_publications_filename.split("-")[1]
-            self.existing_hrefs = get_existing_hrefs(github_webis[website]['username'], github_webis[website]['repo'], github_webis[website]['directory'])
-            grouped = {}
-            for item in bib_publications.entries.values():
-                if 'options' in item.fields and 'skipbib=true' in item.fields['options']:
-                    continue
-                if item.key.startswith("collection-"):
-                    continue
-                if not item.fields['year'] in grouped:
-                    grouped[item.fields['year']] = []
-                item.fields['author'] = format_persons(item.persons.get('author', []), "text")
-                item.fields['data_author'] = ",".join([get_person_name(person, "text") for person in item.persons.get('author', [])])
-                if 'editor' in item.persons:
-                    max_names = max_editor_names
-                    if item.type in ["incollection", "proceedings"]:
-                        max_names = 9999999
-                    item.fields['editor'] = format_persons(item.persons.get('editor', []), "text", max_names)
-                    item.fields['data_editor'] = ",".join([get_person_name(person, "text") for person in item.persons.get('editor', [])])
-                item.fields['bibid'] = item.key.replace(":", "_")
-                item.fields['raw'] = get_raw_bib_entry(item)
-                item.fields['title'] = re.sub("\\\\sc ", "", item.fields['title'].translate(str.maketrans('', '', '{}')))
-                item = self.get_href_if_exists(github_webis[website]['domain'], "publications", item)
-                item = self.get_href_if_exists(github_webis[website]['domain'], "posters", item)
-                item = self.get_href_if_exists(github_webis[website]['domain'], "slides", item)
-
-                artifacts = [re.sub("posters", "poster", re.sub("_href$", "", re.sub("url$", "", field_name))) for field_name in item.fields if (field_name in ["doi", "posters_href", "slides_href"] or (field_name.endswith("url") and field_name != "url")) and item.fields[field_name] != ""]
-                if len(artifacts) > 0:
-                    item.fields['artifacts'] = ",".join(artifacts)
-
-                grouped[item.fields['year']].insert(0, item)
-                self.fields_to_text(item)
-
-            self.sort_publication_items(grouped)
-
-            t = self.templateEnv.get_template("publications.html.jinja2")
+    def get_facets_path(self, site_path, output_publications_filename):
+        """
+        :return: file of the facets of a publications list, served next to its page, None if disabled
+        """
+        if not self.facets:
+            return None
+        return self.output_path + "/" + site_path + f"/facets/{output_publications_filename}.json"
 
-            try:
+    def get_bibtex_files_path(self, site_path, output_publications_filename):
+        """
+        :return: tuple (folder of the BibTeX files of a publications list, their url on the website), tuple of None
+            if the BibTeX is rendered into the entries
+        """
+        if not self.bibtex_files:
+            return None, None
+        return (self.output_path + "/" + site_path + f"/bibtex/{output_publications_filename}",
+                f"/bibtex/{output_publications_filename}")
 
-                output = t.render(bib_entries=OrderedDict(sorted(grouped.items(), reverse=True)).items())
-            except jinja2.exceptions.UndefinedError as e:
-                bib2html_logger.error("Error in: " + str(e), exc_info=True)
-                traceback.print_exc()
-                continue
+    def log_publications(self, bib_files, results, split_years_paths=None):
+        """Log the results of build_publications.
 
-            output_file_path = pathlib.Path(self.output_path + "/" + output_path[output_publications_filename] + f"/_includes/{output_publications_filename}.html")
-            output_file_path.parent.mkdir(exist_ok=True, parents=True)
-            with open(output_file_path, 'w') as outputfile:
-                outputfile.write("{% raw %}\n" + output + "\n{% endraw %}")
+        :param split_years_paths: dict output name -> folder of the year files, if written with split_years
+        """
+        files_parsed_string = "".join(files_parsed for files_parsed, _, _ in results)
+        bib2html_logger.info("""\nBib files parsed: """ + files_parsed_string)
 
-            files_list_str += f"\n- {output_publications_filename}.html"
+        files_list_str = ""
+        for output_publications_filename, (_, written, error) in zip(bib_files.keys(), results):
+            if error:
+                bib2html_logger.error(error)
+            if written and split_years_paths:
+                with open(pathlib.Path(split_years_paths[output_publications_filename]) / "manifest.json") as f:
+                    manifest = json.load(f)
+                files_count = sum(len(year['files']) for year in manifest['years'])
+                files_list_str += f"\n- {output_publications_filename}/ ({files_count} year files and manifest.json)"
+            elif written:
+                files_list_str += f"\n- {output_publications_filename}.html"
         bib2html_logger.info(f"\nWeb pages generated:{files_list_str}")
 
     def lecturenotes(self, bib_files={}):
@@ -644,94 +1850,174 @@ class Bib2Html:
         """
         start = time.time()
         bib2html_logger.info("\n1. Update iranthology.")
-        with open(self.bib_list_template_filename, 'r') as file:
-            bib_list_template = file.read()
 
-        bib_publications = dict()
-        files_parsed_string = ""
-        for k, bib_filename in bib_files.items():
-            try:
-                bib_publications[k] = self.load_bib_file(bib_filename)
-                files_parsed_string += f"\n- {bib_filename}"
-            except Exception as e:
-                files_parsed_string += self.format_stacktrace(bib_filename, e)
-                continue
-        bib2html_logger.info("""\nBib files parsed: """ + files_parsed_string)
-        bib2html_logger.info(F"\nParsing took: {time.time()-start}" )
-
-        files_list_str = ""
-        for output_publications_filename, bib_publications in bib_publications.items():
-            website = output_publications_filename.split("-")[1]
-            #self.existing_hrefs = get_existing_hrefs(github_webis[website]['username'], github_webis[website]['repo'], github_webis[website]['directory'])
-            grouped = {}
-            for item in bib_publications.entries.values():
-                if 'options' in item.fields and 'skipbib=true' in item.fields['options']:
-                    continue
-                if item.key.startswith("collection-"):
-                    continue
-                if not item.fields['year'] in grouped:
-                    grouped[item.fields['year']] = []
-                item.fields['author'] = format_persons(item.persons.get('author', []), "text")
-                item.fields['data_author'] = ",".join([get_person_name(person, "text") for person in item.persons.get('author', [])])
-                if 'editor' in item.persons:
-                    max_names = max_editor_names
-                    if item.type in ["incollection", "proceedings"]:
-                        max_names = 9999999
-                    item.fields['editor'] = format_persons(item.persons.get('editor', []), "text", max_names)
-                    item.fields['data_editor'] = ",".join([get_person_name(person, "text") for person in item.persons.get('editor', [])])
-                item.fields['bibid'] = item.key.replace(":", "_")
-                item.fields['raw'] = get_raw_bib_entry(item)
-                item.fields['title'] = re.sub("\\\\sc ", "", item.fields['title'].translate(str.maketrans('', '', '{}')))
-                #item = self.get_href_if_exists(github_webis[website]['domain'], "publications", item)
-                #item = self.get_href_if_exists(github_webis[website]['domain'], "posters", item)
-                #item = self.get_href_if_exists(github_webis[website]['domain'], "slides", item)
-
-                #artifacts = [re.sub("posters", "poster", re.sub("_href$", "", re.sub("url$", "", field_name))) for field_name in item.fields if (field_name in ["doi", "posters_href", "slides_href"] or (field_name.endswith("url") and field_name != "url")) and item.fields[field_name] != ""]
-                #if len(artifacts) > 0:
-                #    item.fields['artifacts'] = ",".join(artifacts)
-
-                grouped[item.fields['year']].insert(0, item)
-                self.fields_to_text(item)
-
-            self.sort_publication_items(grouped)
-
-            t = self.templateEnv.get_template("publications.html.jinja2")
+        if self.split_years:
+            # static files, served next to the page so that it can fetch the years on demand
+            output_file_paths = {output_publications_filename: self.output_path + "/" + output_publications_filename + f"/{output_publications_filename}"
+                                 for output_publications_filename in bib_files.keys()}
+        else:
+            output_file_paths = {output_publications_filename: self.output_path + "/" + output_publications_filename + f"/_includes/{output_publications_filename}.html"
+                                 for output_publications_filename in bib_files.keys()}
+        search_index_paths = {output_publications_filename: self.get_search_index_path(output_publications_filename,
+                                                                                       output_publications_filename)
+                              for output_publications_filename in bib_files.keys()}
+        bibtex_files_paths = {output_publications_filename: self.get_bibtex_files_path(output_publications_filename,
+                                                                                       output_publications_filename)
+                              for output_publications_filename in bib_files.keys()}
+        facets_paths = {output_publications_filename: self.get_facets_path(output_publications_filename,
+                                                                           output_publications_filename)
+                        for output_publications_filename in bib_files.keys()}
+        if self.shards > 1 and not (self.incremental and self.cache_path):
+            results = [self.build_sharded_publications(bib_filename, output_file_paths[k], search_index_paths[k],
+                                                       *bibtex_files_paths[k], facets_paths[k])
+                       for k, bib_filename in bib_files.items()]
+        else:
+            args_list = [(self.input_path, bib_filename, output_file_paths[k], None, None, self.cache_path, self.incremental,
+                          self.split_years, self.page_size, search_index_paths[k], *bibtex_files_paths[k],
+                          facets_paths[k])
+                         for k, bib_filename in bib_files.items()]
+            results = self.map_jobs(build_publications, args_list)
+        bib2html_logger.info(F"\nParsing and rendering took: {time.time()-start}" )
+
+        self.log_publications(bib_files, results, output_file_paths if self.split_years else None)
+        bib2html_logger.info(f"\nWeb pages generation took:{time.time() - start}")
 
-            try:
+    def build_sharded_publications(self, bib_filename, output_file_path, search_index_path=None, bibtex_path=None,
+                                   bibtex_url=None, facets_path=None):
+        """Like build_publications, but the bib file is split into self.shards chunks that are parsed and
+        prepared by the worker pool. The per-year groups of the chunks are merged in file order, so the
+        result is the same as for a single parse. Only parsing and preparing run in parallel, the list is rendered
+        in this process.
+        """
+        files_parsed = f"\n- {bib_filename}"
+        try:
+            cache = EntryCache(self.cache_path) if self.cache_path else None
+            grouped = None
+            if cache:
+                cache_key = cache.get_key(self.input_path + bib_filename, "other", None, None)
+                grouped = cache.load(bib_filename + ".publications", cache_key)
+            if grouped is None:
+                with open(self.input_path + bib_filename, encoding='iso-8859-1') as f:
+                    bib_string = f.read()
+                chunks = split_bib_string(bib_string, self.shards)
+                # duplicate keys are renamed across chunks, so every chunk continues with the keys of the previous ones
+                args_list = []
+                chunk_keys = []
+                duplicate_keys = DuplicateKeys()
+                for chunk in chunks:
+                    args_list.append((chunk, duplicate_keys.copy()))
+                    chunk_keys.append(get_bib_keys(chunk))
+                    for key in filter(None, chunk_keys[-1]):
+                        duplicate_keys.resolve(key)
+                try:
+                    results = self.map_jobs(prepare_publications_chunk, args_list)
+                    if [keys for _, keys, _ in results] != chunk_keys:
+                        raise ValueError("the scanned keys differ from the parsed ones")
+                except Exception as e:
+                    bib2html_logger.warning(f"Could not parse {bib_filename} in shards ({e}), parsing it without shards.")
+                    results = [prepare_publications_chunk(bib_string)]
+
+                grouped = {}
+                duplicates = []
+                for chunk_grouped, _, chunk_duplicates in results:
+                    for year, entries in chunk_grouped.items():
+                        # group_publication_items inserts at the front, so entries of later chunks go first
+                        grouped[year] = entries + grouped.get(year, [])
+                    duplicates += chunk_duplicates
+                files_parsed += report_duplicate_keys(duplicates)
+                if cache:
+                    cache.dump(bib_filename + ".publications", cache_key, grouped)
+            else:
+                files_parsed += " (cached)"
+        except Exception as e:
+            return self.format_stacktrace(bib_filename, e), False, None
 
-                output = t.render(bib_entries=OrderedDict(sorted(grouped.items(), reverse=True)).items())
-            except jinja2.exceptions.UndefinedError as e:
-                bib2html_logger.error("Error in: " + str(e), exc_info=True)
-                traceback.print_exc()
-                continue
+        error = render_publications(grouped, output_file_path, split_years=self.split_years, page_size=self.page_size,
+                                    bibtex_url=bibtex_path and bibtex_url)
+        if error is None:
+            write_side_files(grouped, search_index_path, bibtex_path, facets_path)
+        return files_parsed, error is None, error
 
-            output_file_path = pathlib.Path(self.output_path + "/" + output_publications_filename + f"/_includes/{output_publications_filename}.html")
-            output_file_path.parent.mkdir(exist_ok=True, parents=True)
-            with open(output_file_path, 'w') as outputfile:
-                outputfile.write("{% raw %}\n" + output + "\n{% endraw %}")
+    @staticmethod
+    def is_listed_publication(item):
+        if 'options' in item.fields and 'skipbib=true' in item.fields['options']:
+            return False
+        return not item.key.startswith("collection-")
 
-            files_list_str += f"\n- {output_publications_filename}.html"
-        bib2html_logger.info(f"\nWeb pages generated:{files_list_str}")
-        bib2html_logger.info(f"\nWeb pages generation took:{time.time() - start}")
+    @staticmethod
+    def group_publication_items(items, domain=None, existing_hrefs=None):
+        """Prepare the publication entries for the template and group them by year.
 
+        :param existing_hrefs: result of get_existing_hrefs, None to skip the artifact lookup
+        :return: dict year -> list of entries
+        """
+        grouped = {}
+        # timed by hand instead of with build_stats.phase, which would add up for large files
+        persons_time = raw_bib_time = artifacts_time = latex_to_text_time = 0.0
+        entries_count = 0
+        for item in items:
+            if not Bib2Html.is_listed_publication(item):
+                continue
+            if not item.fields['year'] in grouped:
+                grouped[item.fields['year']] = []
+            start = time.perf_counter()
+            item.fields['author'] = format_persons(item.persons.get('author', []), "text")
+            item.fields['data_author'] = ",".join([get_person_name(person, "text") for person in item.persons.get('author', [])])
+            if 'editor' in item.persons:
+                max_names = max_editor_names
+                if item.type in ["incollection", "proceedings"]:
+                    max_names = 9999999
+                item.fields['editor'] = format_persons(item.persons.get('editor', []), "text", max_names)
+                item.fields['data_editor'] = ",".join([get_person_name(person, "text") for person in item.persons.get('editor', [])])
+            item.fields['bibid'] = item.key.replace(":", "_")
+            persons_end = time.perf_counter()
+            item.fields['raw'] = get_raw_bib_entry(item)
+            raw_bib_end = time.perf_counter()
+            item.fields['title'] = re.sub("\\\\sc ", "", item.fields['title'].translate(str.maketrans('', '', '{}')))
+            if existing_hrefs is not None:
+                item = add_artifacts(existing_hrefs, domain, item)
+            artifacts_end = time.perf_counter()
+
+            grouped[item.fields['year']].insert(0, item)
+            Bib2Html.fields_to_text(item)
+            item.sort_key = Bib2Html.get_sort_key(item)
+
+            persons_time += persons_end - start
+            raw_bib_time += raw_bib_end - persons_end
+            artifacts_time += artifacts_end - raw_bib_end
+            latex_to_text_time += time.perf_counter() - artifacts_end
+            entries_count += 1
+        build_stats.add_time("persons", persons_time, entries_count)
+        build_stats.add_time("raw_bib", raw_bib_time, entries_count)
+        if existing_hrefs is not None:
+            build_stats.add_time("artifacts", artifacts_time, entries_count)
+        build_stats.add_time("latex_to_text", latex_to_text_time, entries_count)
+        build_stats.count("entries", entries_count)
+        return grouped
 
+    @staticmethod
+    def get_sort_key(item):
+        """Sort key of a prepared publication entry within its year: latest month first, then booktitle and bibid.
+        Entries without a month or with an unknown month come first.
+        """
+        month = item.fields.get('month')
+        month_number = month_numbers.get(month.lower(), 13) if month else 13
+        booktitle = item.fields.get('booktitle') or "aaaaaa"
+        return -month_number, booktitle_digit_regex.sub(r"AAAA\1", booktitle), item.fields['bibid']
 
-    def sort_publication_items(self, grouped):
-        for year, entries in grouped.items():
-            try:
-                grouped[year] = sorted(entries, key=lambda x: (
-                    -datetime.strptime(x.fields['month'], "%B").month if 'month' in x.fields and x.fields['month'] else -13,
-                    re.sub(r"^([0-9])", r"AAAA\1", x.fields['booktitle'] if 'booktitle' in x.fields and x.fields['booktitle'] else "aaaaaa"),
-                    x.fields['bibid']))
-            except Exception as e:
-                print(e)
+    @staticmethod
+    def sort_publication_items(grouped):
+        with build_stats.phase("sort"):
+            for year, entries in grouped.items():
+                grouped[year] = sorted(entries, key=lambda x: x.sort_key)
 
-    def fields_to_text(self, item):
+    @staticmethod
+    def fields_to_text(item):
         try:
             for k, v in item.fields.items():
                 if k == "raw" or type(v) is not str:
                     continue
-                item.fields[k] = v if "url" in k else str(Text.from_latex(v))
+                item.fields[k] = v if "url" in k else latex_to_text_cache.to_text(v)
         except Exception as e:
             print(e)
         
@@ -760,12 +2046,10 @@ class Bib2Html:
         #template = jinja2.Template(self.people_template_filename)
         t = self.templateEnv.get_template("people.html.jinja2")
         
-        output = t.render(peoples=bib_dicts)
+        output = t.generate(peoples=bib_dicts)
 
         output_file_path = pathlib.Path(self.output_path + "/" + output_path + f"/_includes/bib-people.html")
-        output_file_path.parent.mkdir(exist_ok=True, parents=True)
-        with open(output_file_path, 'w') as outputfile:
-            outputfile.write("{% raw %}\n" + output + "\n{% endraw %}")
+        write_output(output_file_path, output)
 
     def teaching(self, bib_files={}, output_path={}):
         
@@ -817,12 +2101,10 @@ class Bib2Html:
         
         t = self.templateEnv.get_template("teaching.html.jinja2")
         
-        output = t.render(semesters=semesters)
+        output = t.generate(semesters=semesters)
 
         output_file_path = pathlib.Path(self.output_path + "/" + output_path + f"/_includes/bib-teaching.html")
-        output_file_path.parent.mkdir(exist_ok=True, parents=True)
-        with open(output_file_path, 'w') as outputfile:
-            outputfile.write("{% raw %}\n" + output + "\n{% endraw %}")
+        write_output(output_file_path, output)
         
     def awards(self, bib_files={}, output_path={}):
         
@@ -855,12 +2137,10 @@ class Bib2Html:
         
         t = self.templateEnv.get_template("awards.html.jinja2")
         
-        output = t.render(awards=awards)
+        output = t.generate(awards=awards)
         
         output_file_path = pathlib.Path(self.output_path + "/" + output_path + f"/_includes/bib-awards.html")
-        output_file_path.parent.mkdir(exist_ok=True, parents=True)
-        with open(output_file_path, 'w') as outputfile:
-            outputfile.write("{% raw %}\n" + output + "\n{% endraw %}")
+        write_output(output_file_path, output)
             
             
     def events(self, bib_files={}, output_path={}):
@@ -901,12 +2181,10 @@ class Bib2Html:
 
         t = self.templateEnv.get_template("event.html.jinja2")
         
-        output = t.render(events=events) 
+        output = t.generate(events=events) 
             
         output_file_path = pathlib.Path(self.output_path + "/" + output_path + f"/_includes/bib-events.html")
-        output_file_path.parent.mkdir(exist_ok=True, parents=True)
-        with open(output_file_path, 'w') as outputfile:
-            outputfile.write("{% raw %}\n" + output + "\n{% endraw %}")
+        write_output(output_file_path, output)
             
             
     
@@ -991,17 +2269,19 @@ class Bib2Html:
 
         t = self.templateEnv.get_template("shared_tasks.html.jinja2")
         
-        output = t.render(event_types=event_types) 
+        output = t.generate(event_types=event_types) 
             
         output_file_path = pathlib.Path(self.output_path + "/" + output_path + f"/_includes/bib-shared-tasks.html")
-        output_file_path.parent.mkdir(exist_ok=True, parents=True)
-        with open(output_file_path, 'w') as outputfile:
-            outputfile.write("{% raw %}\n" + output + "\n{% endraw %}")         
+        write_output(output_file_path, output)         
             
             
             
-    def execute(self, to_execute=["people"], log_capture_string=None):
-        tasks = {'publications': {'func': self.publications,
+    def get_tasks(self):
+        """
+        'per_file' marks tasks that can be run for a subset of their bib files.
+        :return: dict task -> task data
+        """
+        return {'publications': {'func': self.publications,
                                   'files': {'bib-pan': 'pan-publications.bib',
                                             'bib-touche': 'touche-publications.bib',
                                             'bib-webis': 'webis-publications.bib',
@@ -1010,11 +2290,13 @@ class Bib2Html:
                                                   'bib-touche': 'touche-webis-de',
                                                   'bib-webis': 'webis-de',
                                                   'bib-theses': 'webis-de'},
+                                  'per_file': True,
                                   },
                  'ir-anthology': { 'func': self.iranthology,
                                   'files': {'ir-anthology': 'ir-anthology.bib'
                                  },
                                   'output_path': 'ir-anthology',
+                                  'per_file': True,
                                   },
                  'data': {'func': self.data,
                           'files': {'data-webis': 'webis-data.bib',
@@ -1051,17 +2333,126 @@ class Bib2Html:
                                   }
                  }
 
-        for task, task_data in tasks.items():
+    def execute(self, to_execute=["people"], log_capture_string=None):
+        for task, task_data in self.get_tasks().items():
             if task in to_execute:
-                task_data['func'](task_data['files'], task_data['output_path'])
+                self.run_task(task, task_data['func'], task_data['files'], task_data['output_path'])
 
         bib2html_logger.info(f"\nWeb pages generated: {self.html_files_count}")
+        self.log_output_counts()
+        self.log_latex_to_text_cache()
+        self.dump_build_stats()
 
         if log_capture_string:
             self.log_capture_string = log_capture_string
 
         return self.log_capture_string.getvalue()
 
+    def run_task(self, task, func, files, output_path):
+        build_stats.task = task
+        try:
+            with build_stats.phase("total"):
+                func(files, output_path)
+        finally:
+            build_stats.task = "other"
+
+    def dump_build_stats(self):
+        """Write the BuildStats of the run so far as JSON to self.timings_path, if it is set.
+        """
+        if not self.timings_path:
+            return
+        stats = build_stats.to_dict()
+        stats['html_files_count'] = self.html_files_count
+        write_output(self.timings_path, [json.dumps(stats, indent=2)], raw=False)
+
+    @staticmethod
+    def get_output_counts():
+        """
+        :return: tuple (written output files, unchanged output files) of all tasks, see write_output
+        """
+        return tuple(sum(task_counts.get(name, 0) for task_counts in build_stats.counts.values())
+                     for name in ("files_written", "files_unchanged"))
+
+    def log_output_counts(self, previous_counts=(0, 0)):
+        """Log how many output files were written and how many were left untouched since their content did not change.
+
+        :param previous_counts: result of get_output_counts before the run, to log only the files of the run
+        """
+        written, unchanged = self.get_output_counts()
+        bib2html_logger.info(f"\nFiles written: {written - previous_counts[0]}, unchanged: {unchanged - previous_counts[1]}")
+
+    def log_latex_to_text_cache(self):
+        stats = latex_to_text_cache.get_stats()
+        bib2html_logger.info(f"\nLaTeX to text conversions: {stats['hits']} of {stats['hits'] + stats['misses']} cached "
+                             f"({stats['hit_rate']:.1%}, {stats['size']} values), saved about {stats['time_saved']:.2f}s")
+        if self.cache_path:
+            latex_to_text_cache.dump(self.cache_path)
+
+    def watch(self, to_execute=["people"], interval=1.0):
+        """Build the given tasks, then poll their bib files and the templates and rebuild only the outputs
+        affected by a change until interrupted with Ctrl+C.
+        """
+        tasks = {task: task_data for task, task_data in self.get_tasks().items() if task in to_execute}
+        people_path = self.input_path + "webis-people.bib"
+
+        def get_mtimes():
+            paths = [self.input_path + f for task_data in tasks.values() for f in task_data['files'].values()]
+            paths += [str(p) for p in pathlib.Path(script_dir + "/templates").glob("*.jinja2")]
+            paths.append(people_path)
+            return {path: os.stat(path).st_mtime_ns if os.path.exists(path) else None for path in paths}
+
+        mtimes = get_mtimes()
+        try:
+            self.execute(to_execute)
+        except Exception:
+            bib2html_logger.error(f"\nBuild failed:\n{traceback.format_exc()}")
+        output_counts = self.get_output_counts()
+        bib2html_logger.info(f"\nWatching {self.input_path} and templates for changes (Ctrl+C to stop).")
+        try:
+            while True:
+                time.sleep(interval)
+                new_mtimes = get_mtimes()
+                changed = {path for path, mtime in new_mtimes.items() if mtime != mtimes.get(path)}
+                mtimes = new_mtimes
+                if not changed:
+                    continue
+
+                start = time.time()
+                changed_names = ', '.join(sorted(os.path.basename(p) for p in changed))
+                try:
+                    templates_changed = any(path.endswith(".jinja2") for path in changed)
+                    if people_path in changed:
+                        # parsed again by the next task that needs it
+                        self._bib_data_people = None
+                    for task, task_data in tasks.items():
+                        files = {k: f for k, f in task_data['files'].items() if self.input_path + f in changed}
+                        if task == 'data' and people_path in changed:
+                            files = task_data['files']
+                        if not files and not templates_changed:
+                            continue
+                        if templates_changed or not task_data.get('per_file'):
+                            files = task_data['files']
+                        self.run_task(task, task_data['func'], files, task_data['output_path'])
+                    self.log_output_counts(output_counts)
+                    output_counts = self.get_output_counts()
+                    self.log_latex_to_text_cache()
+                    self.dump_build_stats()
+                    bib2html_logger.info(f"\nRebuild after change of {changed_names} took: {time.time() - start:.2f}s")
+                except Exception:
+                    # keep watching, e.g. if a bib file was saved in the middle of an edit
+                    bib2html_logger.error(f"\nRebuild after change of {changed_names} failed:\n{traceback.format_exc()}")
+                    output_counts = self.get_output_counts()
+        except KeyboardInterrupt:
+            pass
+
+
+def positive_int(value):
+    """argparse type for counts like --jobs that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Webis web-database to HTML exporter')
@@ -1073,7 +2464,50 @@ if __name__ == '__main__':
     parser.add_argument('-f', '--output-overwrite', action='store_true', help="Overwrite output path.")
     parser.add_argument('-t', '--tasks', type=str, nargs='+', default=["people"],
                         help="Set tasks (all by default).")
+    parser.add_argument('-j', '--jobs', type=positive_int, default=1,
+                        help="Number of worker processes used to parse and render the bib files.")
+    parser.add_argument('--shards', type=positive_int, default=1,
+                        help="Split the ir-anthology bib file into chunks that are parsed and prepared in parallel.")
+    parser.add_argument('--cache-path', type=str, default=None, dest='cache_path',
+                        help="Folder to cache parsed and prepared bib entries between runs.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only prepare and render publications whose bib source changed (requires --cache-path).")
+    parser.add_argument('--split-years', action='store_true', dest='split_years',
+                        help="Write the ir-anthology as one static html file per year plus a manifest.json.")
+    parser.add_argument('--page-size', type=positive_int, default=None, dest='page_size',
+                        help="With --split-years, split years into pages of at most this many entries.")
+    parser.add_argument('--search-index', action='store_true', dest='search_index',
+                        help="Also write an inverted index of every publications list as static JSON files to "
+                             "search-index/ next to its page.")
+    parser.add_argument('--bibtex-files', action='store_true', dest='bibtex_files',
+                        help="Write the BibTeX of the publications to one JSON file per year in bibtex/ next to the "
+                             "page, which loads it on demand, instead of into a textarea of every entry.")
+    parser.add_argument('--facets', action='store_true',
+                        help="Also write the author, venue and year facets of every publications list with their "
+                             "bibids to facets/<name>.json next to the page.")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and rebuild outputs whenever their bib files or templates change.")
+    parser.add_argument('--watch-interval', type=float, default=1.0, dest='watch_interval',
+                        help="Seconds between two checks for changed files in watch mode.")
+    parser.add_argument('--artifacts-path', type=str, default=None, dest='artifacts_path',
+                        help="Folder with local clones <username>/<repo> of the artifact repositories, used instead "
+                             "of requesting their listings from GitHub.")
+    parser.add_argument('--artifacts-ttl', type=float, default=3600, dest='artifacts_ttl',
+                        help="Seconds a listing of an artifact repository cached in --cache-path is used without "
+                             "revalidation (inf to never request a cached listing again).")
+    parser.add_argument('--timings-path', type=str, default=None, dest='timings_path',
+                        help="JSON file to write the timings of all task phases, entry counts, peak RSS and cache hit "
+                             "rates to.")
+    parser.add_argument('--profile', type=str, default=None, dest='profile_path',
+                        help="Run under cProfile, write the stats to this file and log the slowest functions "
+                             "(of the main process only).")
     args = parser.parse_args()
+    if args.incremental and not args.cache_path:
+        parser.error("--incremental requires --cache-path")
+    if args.watch:
+        # watch mode always rebuilds incrementally, in a temporary cache if none is given
+        args.incremental = True
+        args.cache_path = args.cache_path or tempfile.mkdtemp(prefix="bib2html-cache-")
     bib2html_logger.info("bib2html.py script called with arguments: %s" % vars(args))
 
     input_path = pathlib.Path(args.input_path)
@@ -1087,7 +2521,29 @@ if __name__ == '__main__':
                 f"use -c option to create output directory.")
     if any(output_path.iterdir()) and not args.output_overwrite:
         sys.exit(f"Directory is not empty: {output_path.absolute()}, use -f option to overwrite.")
-    bib2html = Bib2Html(args.input_path, args.output_path)
-
-    # tasks to be executed
-    bib2html.execute(args.tasks)
+    bib2html = Bib2Html(args.input_path, args.output_path, jobs=args.jobs, shards=args.shards,
+                        cache_path=args.cache_path, incremental=args.incremental,
+                        split_years=args.split_years, page_size=args.page_size,
+                        artifacts_path=args.artifacts_path, artifacts_ttl=args.artifacts_ttl,
+                        timings_path=args.timings_path, search_index=args.search_index,
+                        bibtex_files=args.bibtex_files, facets=args.facets)
+
+    profiler = None
+    if args.profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        # tasks to be executed
+        if args.watch:
+            bib2html.watch(args.tasks, args.watch_interval)
+        else:
+            bib2html.execute(args.tasks)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile_path)
+            import pstats
+            profile_stats = io.StringIO()
+            pstats.Stats(profiler, stream=profile_stats).sort_stats("cumulative").print_stats(30)
+            bib2html_logger.info("\nProfile (slowest functions by cumulative time):\n" + profile_stats.getvalue())
@@ -4,6 +4,7 @@ VENV_NAME=test
 PYTHON=${VENV_NAME}/bin/python3
 INPUT_PATH=../bibliographies-webis/
 OUTPUT_PATH=../bibliographies-webis/html/
+CACHE_PATH=.bib2html-cache/
 
 {
   if [ ! -d "${VENV_NAME}" ];then
@@ -18,6 +19,5 @@ OUTPUT_PATH=../bibliographies-webis/html/
   exit 1
 }
 
-rm -rf ${OUTPUT_PATH}
-${PYTHON} bib2html.py --input-path ${INPUT_PATH} --output-path ${OUTPUT_PATH} -cf
+${PYTHON} bib2html.py --input-path ${INPUT_PATH} --output-path ${OUTPUT_PATH} --cache-path ${CACHE_PATH} -cf
 
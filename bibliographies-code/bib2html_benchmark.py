@@ -0,0 +1,501 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Benchmark for bib2html.py on synthetic bib corpora of increasing size, to catch performance and scaling regressions
+without production data and without network access (the artifact listings of GitHub are stubbed).
+
+For every size, a corpus resembling webis-publications.bib and pan-publications.bib (LaTeX accents, long author
+lists, mixed entry types, artifact links) is generated: the ir-anthology.bib has SIZE entries, the four publications
+bib files have SIZE entries together, the data bib files SIZE / 10 entries. Every task runs in its own process, which
+reports the time of the task, the throughput in entries/s and the peak memory.
+
+With --self-test, no benchmark is run, instead a few checks of bib2html on a small corpus that are easy to break
+unnoticed: the stats of the worker processes (with the spawn start method), including their entry cache hits, reach
+the timings of the main process, and the artifact listings are requested from a local stub of the GitHub API with
+retries, revalidated with their ETag and kept if GitHub can not be reached.
+
+usage: bib2html_benchmark.py [-h] [--sizes N [N ...]] [--tasks TASK [TASK ...]] [--jobs N] [--self-test]
+
+arguments:
+  -h, --help            show this help message and exit
+  --sizes N [N ...]     Corpus sizes in entries (1000 10000 100000 by default)
+  --tasks TASK [TASK ...]
+                        Tasks of Bib2Html.execute to benchmark (publications ir-anthology data people by default)
+  --jobs N, -j N        Number of worker processes of bib2html (1 by default)
+  --work-path WORK_PATH
+                        Folder for the corpora and outputs (a temporary folder by default, removed afterwards)
+  --results-path RESULTS_PATH
+                        JSON file to write the results to
+  --baseline BASELINE   JSON file with the results of an earlier run, fail if a throughput dropped by more than
+                        --max-slowdown
+  --max-slowdown FRACTION
+                        Allowed relative drop of the throughput compared to --baseline (0.25 by default)
+  --self-test           Run the checks instead of the benchmark, fail if one of them fails
+
+"""
+
+import argparse
+import http.server
+import json
+import multiprocessing
+import os
+import pathlib
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+first_names = ["Benno", "Martin", "Matthias", "Johannes", "Henning", "J{\\\"u}rgen", "Maik", "Shahbaz", "Tim",
+               "Janek", "Magdalena", "Efstathios", "Fran{\\c{c}}ois", "Ren{\\'e}", "S{\\o}ren", "Bj{\\\"o}rn",
+               "Andr{\\'e}s", "Ji{\\v{r}}{\\'\\i}", "Zeyang", "Yihui", "Nicola", "Guglielmo", "Paolo", "Ma{\\l}gorzata",
+               "Ana", "Jos{\\'e}", "Anne", "Elad", "Einat", "Teresa"]
+middle_names = ["A.", "J.", "M.", "van", "de", ""]
+last_names = ["Stein", "Potthast", "Hagen", "Kiesel", "Wachsmuth", "Weiner", "Anand", "Syed", "Gollub", "Bevendorff",
+              "Wolska", "Stamatatos", "Fr{\\\"o}be", "M{\\\"u}ller", "Gon{\\c{c}}alves", "Garc{\\'\\i}a",
+              "{Kleine B{\\\"u}ning}", "{van der Berg}", "Faggioli", "Ferro", "Rosso", "{\\O}stergaard", "Huang",
+              "Lin", "Peng", "Ye", "Rangel", "Kestemont", "Amig{\\'o}", "{De Santis}"]
+title_words = ["Retrieval", "Argument", "Search", "Query", "Authorship", "Verification", "Plagiarism", "Detection",
+               "Neural", "Ranking", "Web", "Corpus", "Analysis", "Clickbait", "Spoiling", "Large", "Language", "Models",
+               "Evaluation", "Sch{\\\"a}tzung", "{\\sc Netspeak}", "{BERT}", "Touch{\\'e}", "{CLEF}", "Efficient",
+               "Reproducibility", "Conversational", "Summarization", "Keyqueries", "Crowdsourcing"]
+booktitles = ["{Advances in Information Retrieval. 45th European Conference on IR Research (ECIR 2023)}",
+              "{44th International ACM Conference on Research and Development in Information Retrieval (SIGIR 2021)}",
+              "{Working Notes Papers of the CLEF 2022 Evaluation Labs}",
+              "{2019 IEEE/WIC/ACM International Conference on Web Intelligence}",
+              "{Proceedings of the 61st Annual Meeting of the Association for Computational Linguistics (ACL 2023)}",
+              "{Workshop f{\\\"u}r Qualit{\\\"a}tssicherung}",
+              "{Findings of the Association for Computational Linguistics: EMNLP 2022}",
+              "{8th International Workshop on Argument Mining (ArgMining 2021) at EMNLP}"]
+journals = ["{Information Processing \\& Management}", "{ACM Transactions on Information Systems}",
+            "{Datenbank-Spektrum}", "{Journal of the Association for Information Science and Technology}"]
+publishers = ["{ACM}", "{Springer}", "{CEUR-WS.org}", "{Association for Computational Linguistics}", "{IEEE}"]
+months = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+keywords = ["argumentation", "authorship", "clickbait", "conversational search", "crowdsourcing", "ir",
+            "plagiarism", "query understanding", "reproducibility", "web archive"]
+# entry types with their share in webis-publications.bib and pan-publications.bib
+entry_types = [("InProceedings", 75), ("Article", 6), ("Misc", 6), ("Proceedings", 4), ("InCollection", 2),
+               ("TechReport", 2), ("PhDThesis", 2), ("MastersThesis", 2), ("Book", 1)]
+data_categories = ["released-webis-corpora", "pan-corpora", "touche-corpora", "internal-webis-corpora",
+                   "affiliated-corpora"]
+# output files of the publications task and their share of the entries, see Bib2Html.get_tasks
+publications_files = [("pan-publications.bib", 40), ("webis-publications.bib", 40), ("webis-theses.bib", 15),
+                      ("touche-publications.bib", 5)]
+people_count = 50
+
+
+def get_person(rnd):
+    name = [rnd.choice(first_names), rnd.choice(middle_names), rnd.choice(last_names)]
+    return " ".join(part for part in name if part)
+
+
+def get_authors(rnd):
+    # mostly short author lists, with a long tail like in shared task overviews
+    count = min(int(rnd.paretovariate(1.2)), 40)
+    return " and ".join(get_person(rnd) for _ in range(count))
+
+
+def get_title(rnd):
+    return "{" + " ".join(rnd.choice(title_words) for _ in range(rnd.randint(3, 12))) + "}"
+
+
+def get_publication_entry(rnd, index, artifacts):
+    """
+    :param artifacts: dict bibid -> artifact hrefs, filled for some entries, see run_task
+    :return: bib string of a synthetic publication entry
+    """
+    entry_type = rnd.choices([t for t, _ in entry_types], weights=[w for _, w in entry_types])[0]
+    year = rnd.randint(1985, 2024)
+    last_name = rnd.choice(last_names).strip("{}").split()[-1].lower()
+    key = f"{''.join(c for c in last_name if c.isalpha())}:{year}{index}"
+    fields = {'author': "{" + get_authors(rnd) + "}",
+              'title': get_title(rnd),
+              'year': str(year),
+              'keywords': "{" + ", ".join(rnd.sample(keywords, 2)) + "}"}
+    if rnd.random() < 0.9:
+        fields['month'] = rnd.choice(months)
+    if entry_type in ["InProceedings", "InCollection", "Proceedings"]:
+        fields['booktitle'] = rnd.choice(booktitles)
+        fields['publisher'] = rnd.choice(publishers)
+        fields['pages'] = f"{{{index % 500 + 1}--{index % 500 + 12}}}"
+    if entry_type in ["InCollection", "Proceedings"] or rnd.random() < 0.2:
+        fields['editor'] = "{" + " and ".join(get_person(rnd) for _ in range(rnd.randint(1, 8))) + "}"
+    if entry_type == "Article":
+        fields['journal'] = rnd.choice(journals)
+        fields['volume'] = str(rnd.randint(1, 60))
+    if entry_type in ["PhDThesis", "MastersThesis"]:
+        fields['school'] = "{Bauhaus-Universit{\\\"a}t Weimar}"
+    if entry_type == "TechReport":
+        fields['institution'] = "{Bauhaus-Universit{\\\"a}t Weimar}"
+    if rnd.random() < 0.6:
+        fields['doi'] = f"{{10.1145/{year}.{index}}}"
+        fields['url'] = f"{{https://doi.org/10.1145/{year}.{index}}}"
+    if rnd.random() < 0.2:
+        fields['codeurl'] = f"{{https://github.com/webis-de/{key.replace(':', '-')}}}"
+    if rnd.random() < 0.1:
+        fields['dataurl'] = f"{{https://zenodo.org/record/{index}}}"
+    if rnd.random() < 0.01:
+        fields['options'] = "{skipbib=true}"
+
+    bibid = key.replace(":", "_")
+    if rnd.random() < 0.3:
+        artifacts[bibid] = {'publications': f"downloads/publications/papers/{bibid}.pdf"}
+        if rnd.random() < 0.3:
+            artifacts[bibid]['slides'] = f"downloads/publications/slides/{bibid}.pdf"
+        if rnd.random() < 0.2:
+            artifacts[bibid]['posters'] = f"downloads/publications/posters/{bibid}.pdf"
+
+    fields_string = ",\n".join(f"  {name:<24}= {value}" for name, value in fields.items())
+    return f"@{entry_type}{{{key},\n{fields_string}\n}}\n\n"
+
+
+def get_data_entry(rnd, index, category):
+    key = f"webis-{rnd.choice(keywords).replace(' ', '-')}-{index}"
+    people = [f"person{rnd.randrange(people_count)}" for _ in range(rnd.randint(1, 6))]
+    synopsis = "-"
+    if category != "other-corpora" and rnd.random() < 0.5:
+        synopsis = "<p>" + " ".join(rnd.choice(title_words) for _ in range(60)) + "</p>"
+    fields = {'author': "{" + ", ".join(people) + "}",
+              'authorkeys': "{" + ", ".join(people) + "}",
+              'category': "{" + category + "}",
+              'doi': "{-}",
+              'googleurl': f"{{https://toolbox.google.com/datasetsearch/search?query={key}}}",
+              'publisher': "{Webis Group}",
+              'sizebytescompressed': f"{{{rnd.randint(1, 999)} MB}}",
+              'sizeunits': f"{{{rnd.randint(1, 999)}K}}",
+              'sizeunittype': "{documents}",
+              'synopsishtml': "{" + synopsis + "}",
+              'keywords': "{" + ", ".join(rnd.sample(keywords, 3)) + "}",
+              'tasks': "{Text Classification}",
+              'title': "{" + key + "}",
+              'url': "{-}",
+              'year': str(rnd.randint(2000, 2024)),
+              'zenodourl': f"{{https://doi.org/10.5281/zenodo.{index}}}" if rnd.random() < 0.5 else "{}"}
+    fields_string = ",\n".join(f"  {name:<22}= {value}" for name, value in fields.items())
+    return f"@Misc{{{key},\n{fields_string}\n}}\n\n"
+
+
+def get_people_entry(index):
+    fields = {'email': f"{{person{index}@uni-weimar.de}}",
+              'namefirst': "{" + first_names[index % len(first_names)] + "}",
+              'namelast': "{" + last_names[index % len(last_names)] + "}",
+              'wecategory': "{assistants}",
+              'institution': "{Bauhaus-Universit{\\\"a}t Weimar}"}
+    fields_string = ",\n".join(f"  {name:<24}= {value}" for name, value in fields.items())
+    return f"@Misc{{person{index},\n{fields_string}\n}}\n\n"
+
+
+def generate_corpus(corpus_path, size, seed=0):
+    """Write the synthetic bib files of the given size and the stubbed artifact hrefs to corpus_path.
+
+    :return: dict task -> number of generated entries the task processes
+    """
+    rnd = random.Random(seed)
+    corpus_path = pathlib.Path(corpus_path)
+    corpus_path.mkdir(exist_ok=True, parents=True)
+    artifacts = {}
+
+    index = 0
+    total_weight = sum(weight for _, weight in publications_files)
+    for filename, weight in publications_files:
+        with open(corpus_path / filename, 'w', encoding='iso-8859-1') as f:
+            for _ in range(size * weight // total_weight):
+                f.write(get_publication_entry(rnd, index, artifacts))
+                index += 1
+    with open(corpus_path / "ir-anthology.bib", 'w', encoding='iso-8859-1') as f:
+        for i in range(size):
+            f.write(get_publication_entry(rnd, i, {}))
+    data_size = max(size // 10, len(data_categories))
+    with open(corpus_path / "webis-data.bib", 'w', encoding='iso-8859-1') as f:
+        for i in range(data_size // 2):
+            f.write(get_data_entry(rnd, i, data_categories[i % len(data_categories)]))
+    with open(corpus_path / "other-data.bib", 'w', encoding='iso-8859-1') as f:
+        for i in range(data_size // 2, data_size):
+            f.write(get_data_entry(rnd, i, "other-corpora"))
+    with open(corpus_path / "webis-people.bib", 'w', encoding='iso-8859-1') as f:
+        for i in range(people_count):
+            f.write(get_people_entry(i))
+    with open(corpus_path / "artifacts.json", 'w') as f:
+        json.dump(artifacts, f)
+
+    return {'publications': index, 'ir-anthology': size, 'data': data_size, 'people': people_count}
+
+
+def run_task(corpus_path, output_path, task, jobs, timings_path, start_method=None, cache_path=None):
+    """Run a single task of bib2html on the corpus, called in a fresh process by benchmark_task.
+
+    :param start_method: start method of the worker processes, the default of the platform if None
+    :param cache_path: see Bib2Html, no cache if None
+    """
+    if start_method:
+        multiprocessing.set_start_method(start_method, force=True)
+    sys.path.insert(0, script_dir)
+    import bib2html
+
+    with open(pathlib.Path(corpus_path) / "artifacts.json") as f:
+        artifacts = json.load(f)
+
+    def stub_existing_hrefs(self, username, repo, directory):
+        return artifacts
+
+    # no requests to GitHub, all websites get the generated artifacts
+    bib2html.ArtifactIndex.prefetch = lambda self, repos: None
+    bib2html.ArtifactIndex.get_existing_hrefs = stub_existing_hrefs
+    bib2html_runner = bib2html.Bib2Html(str(corpus_path) + "/", str(output_path), jobs=jobs,
+                                        timings_path=str(timings_path), cache_path=cache_path)
+    bib2html_runner.execute([task])
+
+
+def run_task_process(corpus_path, output_path, task, jobs, *args):
+    """Run a single task in a fresh process, see run_task.
+
+    :param args: further arguments of the --run-task call
+    :return: the timings of the task
+    """
+    timings_path = pathlib.Path(output_path) / f"timings-{task}.json"
+    subprocess.run([sys.executable, os.path.abspath(__file__), "--run-task", task, "--jobs", str(jobs),
+                    "--corpus-path", str(corpus_path), "--output-path", str(output_path),
+                    "--timings-path", str(timings_path), *args], check=True, stdout=subprocess.DEVNULL)
+    with open(timings_path) as f:
+        return json.load(f)
+
+
+def benchmark_task(corpus_path, output_path, task, jobs, entries):
+    """
+    :return: dict with the time, throughput and peak memory of the task
+    """
+    start = time.perf_counter()
+    timings = run_task_process(corpus_path, output_path, task, jobs)
+    wall_time = time.perf_counter() - start
+
+    task_time = timings['tasks'][task]['phases']['total']['time']
+    peak_rss = timings['peak_rss'] or {}
+    return {'task': task,
+            'entries': entries,
+            'time': round(task_time, 4),
+            'wall_time': round(wall_time, 4),
+            'entries_per_second': round(entries / task_time, 1) if task_time else None,
+            'peak_rss_mb': round(max(peak_rss.get('self_kb', 0), peak_rss.get('children_kb', 0)) / 1024, 1),
+            'phases': {name: phase['time'] for name, phase in timings['tasks'][task]['phases'].items()}}
+
+
+def check_baseline(results, baseline, max_slowdown):
+    """
+    :return: list of messages for all results whose throughput dropped by more than max_slowdown
+    """
+    baseline_throughputs = {(r['size'], r['task']): r['entries_per_second'] for r in baseline}
+    regressions = []
+    for r in results:
+        baseline_throughput = baseline_throughputs.get((r['size'], r['task']))
+        if baseline_throughput and r['entries_per_second'] < baseline_throughput * (1 - max_slowdown):
+            regressions.append(f"{r['task']} at {r['size']} entries: {r['entries_per_second']:.0f} entries/s, "
+                               f"baseline {baseline_throughput:.0f} entries/s")
+    return regressions
+
+
+def check_worker_stats(work_path):
+    """The publications are built by worker processes, whose entry counts and cache stats must reach the timings
+    even if the workers are spawned instead of forked.
+
+    :return: list of messages of the failed checks
+    """
+    corpus_path = work_path / "corpus-self-test"
+    generate_corpus(corpus_path, 200)
+    output_path = work_path / "output-self-test" / "worker-stats"
+    output_path.mkdir(exist_ok=True, parents=True)
+    timings = run_task_process(corpus_path, output_path, "publications", 2, "--start-method", "spawn")
+
+    failures = []
+    latex_to_text = timings['caches']['latex_to_text']
+    if not timings['tasks']['publications']['counts'].get('entries'):
+        failures.append("no entries counted by the worker processes")
+    if not latex_to_text['hits'] + latex_to_text['misses']:
+        failures.append("no LaTeX to text lookups of the worker processes")
+    if not timings['caches']['person_names']['size']:
+        failures.append("no person names of the worker processes")
+
+    # the second run loads the prepared entries of the four publications files from the cache in the workers
+    cache_path = work_path / "cache-self-test"
+    for _ in range(2):
+        timings = run_task_process(corpus_path, output_path, "publications", 2, "--start-method", "spawn",
+                                   "--cache-path", str(cache_path))
+    if timings['caches']['entries']['hits'] < 4:
+        failures.append(f"{timings['caches']['entries']['hits']} entry cache hits instead of at least 4 for the "
+                        f"publications files of the worker processes")
+    return failures
+
+
+class StubGitHubHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the file tree of every repository like the GitHub API, see check_github_requests.
+
+    The server has the attributes failures (number of requests to answer with 503 before the next successful one),
+    down (answer all requests with 503), requests (number of requests) and etags (If-None-Match headers received).
+    """
+    tree = {'tree': [{'path': "publications/papers/stein_2012a.pdf"}, {'path': "slides/stein_2012a.pdf"}]}
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        server.etags.append(self.headers.get("If-None-Match"))
+        if server.down or server.failures > 0:
+            server.failures -= 1
+            self.send_response(503)
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == '"tree-1"':
+            self.send_response(304)
+            self.end_headers()
+        else:
+            body = json.dumps(self.tree).encode()
+            self.send_response(200)
+            self.send_header("ETag", '"tree-1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def check_github_requests(work_path):
+    """The artifact listings are requested from GitHub with retries, revalidated with their ETag once the ttl is
+    over, and the stored listing is used if GitHub can not be reached, which is then not requested again in the run.
+
+    :return: list of messages of the failed checks
+    """
+    sys.path.insert(0, script_dir)
+    import bib2html
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+    server.failures, server.down, server.requests, server.etags = 0, False, 0, []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    github_settings = bib2html.github_api_url, bib2html.github_backoff, bib2html.github_session
+    bib2html.github_api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    bib2html.github_backoff = 0
+    bib2html.github_session = None
+    paths = [x['path'] for x in StubGitHubHandler.tree['tree']]
+    failures = []
+    try:
+        server.failures = 2
+        try:
+            bib2html.request_github("webis-de", "downloads")
+        except Exception as e:
+            failures.append(f"a tree whose first 2 requests failed was not retried: {e}")
+        if server.requests != 3:
+            failures.append(f"{server.requests} requests instead of 3 for a tree whose first 2 requests failed")
+        server.failures = 0
+
+        # ttl 0: the listing stored by the first run is revalidated in the second one
+        cache_path = work_path / "cache-self-test-github"
+        bib2html.ArtifactIndex(cache_path=cache_path, ttl=0).get_paths("webis-de", "downloads")
+        server.requests, server.etags = 0, []
+        listing_paths = bib2html.ArtifactIndex(cache_path=cache_path, ttl=0).get_paths("webis-de", "downloads")
+        if server.etags != ['"tree-1"'] or listing_paths != paths:
+            failures.append(f"the stored listing was not revalidated with its ETag (If-None-Match headers "
+                            f"{server.etags}, paths {listing_paths})")
+
+        server.down = True
+        server.requests = 0
+        artifact_index = bib2html.ArtifactIndex(cache_path=cache_path, ttl=0)
+        listing_paths = artifact_index.get_paths("webis-de", "downloads")
+        requests = server.requests
+        artifact_index.get_paths("webis-de", "downloads")
+        if listing_paths != paths:
+            failures.append(f"the stored listing was not used while GitHub was down, but {listing_paths}")
+        if requests != bib2html.github_retries + 1 or server.requests != requests:
+            failures.append(f"{requests} and {server.requests - requests} requests instead of "
+                            f"{bib2html.github_retries + 1} and 0 for an unreachable repository requested twice")
+    finally:
+        server.shutdown()
+        server.server_close()
+        bib2html.github_api_url, bib2html.github_backoff, bib2html.github_session = github_settings
+    return failures
+
+
+def self_test(args):
+    work_path = pathlib.Path(args.work_path or tempfile.mkdtemp(prefix="bib2html-self-test-"))
+    failures = []
+    try:
+        for check in [check_worker_stats, check_github_requests]:
+            check_failures = check(work_path)
+            print(f"{check.__name__}: {'failed' if check_failures else 'ok'}")
+            failures += check_failures
+    finally:
+        if not args.work_path:
+            shutil.rmtree(work_path, ignore_errors=True)
+    if failures:
+        print("\nFailed checks:\n- " + "\n- ".join(failures))
+        sys.exit(1)
+
+
+def main(args):
+    work_path = pathlib.Path(args.work_path or tempfile.mkdtemp(prefix="bib2html-benchmark-"))
+    results = []
+    try:
+        print(f"{'size':>8} {'task':<14} {'entries':>8} {'time [s]':>9} {'entries/s':>10} {'peak RSS [MB]':>14}")
+        for size in args.sizes:
+            corpus_path = work_path / f"corpus-{size}"
+            entries = generate_corpus(corpus_path, size)
+            for task in args.tasks:
+                output_path = work_path / f"output-{size}" / task
+                output_path.mkdir(exist_ok=True, parents=True)
+                result = benchmark_task(corpus_path, output_path, task, args.jobs, entries.get(task, size))
+                result['size'] = size
+                results.append(result)
+                print(f"{size:>8} {task:<14} {result['entries']:>8} {result['time']:>9.2f} "
+                      f"{result['entries_per_second'] or 0:>10.0f} {result['peak_rss_mb']:>14.1f}")
+    finally:
+        if not args.work_path:
+            shutil.rmtree(work_path, ignore_errors=True)
+
+    if args.results_path:
+        with open(args.results_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = check_baseline(results, json.load(f), args.max_slowdown)
+        if regressions:
+            print("\nThroughput regressions:\n- " + "\n- ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark for bib2html.py on synthetic bib corpora')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="Corpus sizes in entries.")
+    parser.add_argument('--tasks', type=str, nargs='+', default=["publications", "ir-anthology", "data", "people"],
+                        help="Tasks of Bib2Html.execute to benchmark.")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Number of worker processes of bib2html.")
+    parser.add_argument('--work-path', type=str, default=None, dest='work_path',
+                        help="Folder for the corpora and outputs (a temporary folder by default, removed afterwards).")
+    parser.add_argument('--results-path', type=str, default=None, dest='results_path',
+                        help="JSON file to write the results to.")
+    parser.add_argument('--baseline', type=str, default=None,
+                        help="JSON file with the results of an earlier run, fail if a throughput dropped by more "
+                             "than --max-slowdown.")
+    parser.add_argument('--max-slowdown', type=float, default=0.25, dest='max_slowdown',
+                        help="Allowed relative drop of the throughput compared to --baseline.")
+    parser.add_argument('--self-test', action='store_true', dest='self_test',
+                        help="Run the checks instead of the benchmark, fail if one of them fails.")
+    # internal, to run a single task in a fresh process
+    parser.add_argument('--run-task', type=str, default=None, dest='run_task', help=argparse.SUPPRESS)
+    parser.add_argument('--corpus-path', type=str, default=None, dest='corpus_path', help=argparse.SUPPRESS)
+    parser.add_argument('--output-path', type=str, default=None, dest='output_path', help=argparse.SUPPRESS)
+    parser.add_argument('--timings-path', type=str, default=None, dest='timings_path', help=argparse.SUPPRESS)
+    parser.add_argument('--start-method', type=str, default=None, dest='start_method', help=argparse.SUPPRESS)
+    parser.add_argument('--cache-path', type=str, default=None, dest='cache_path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_task:
+        run_task(args.corpus_path, args.output_path, args.run_task, args.jobs, args.timings_path, args.start_method,
+                 args.cache_path)
+    elif args.self_test:
+        self_test(args)
+    else:
+        main(args)